@@ -4,12 +4,18 @@ import logging
 import pkg_resources
 from contextlib import contextmanager
 
+from sqlalchemy import inspect, text, select, func, or_, and_, DDL
+from sqlalchemy.exc import DBAPIError, NoSuchTableError
 from sqlalchemy.engine import create_engine
 from sqlalchemy.orm.session import Session
 
 from .version import __version__
+from models import convert_guids, materialized_views, refresh_views
+from models.common.enums import ActionType
+from models.common.events import MatchActions, event_fields
+from models.common.personnel import Persons
 from etl.ecsv import CSVExtractor
-from etl import ETL, MarcottiTransform, MarcottiLoad
+from etl import ETL, MarcottiTransform, MarcottiEventTransform, MarcottiLoad
 
 
 logger = logging.getLogger(__name__)
@@ -35,9 +41,170 @@ class Marcotti(object):
         """
         return re.sub(r"//.*@", "//", uri)
 
-    def create_db(self, base):
+    def create_db(self, base, materialized_views=False, partitions=None):
+        """
+        Create data models, views and indexes of the Marcotti schema.
+
+        :param base: Declarative base of the Marcotti schema.
+        :param materialized_views: If True, create the event views as summary tables, which are
+                                   refreshed as match actions are loaded.
+        :param partitions: Number of hash partitions of the match events and match actions tables,
+                           or None for unpartitioned tables.  PostgreSQL 12+ databases only.
+        """
         logger.info("Creating data models")
-        base.metadata.create_all(self.connection)
+        if partitions and self.engine.dialect.name != 'postgresql':
+            logger.warning("Table partitioning not supported by {} databases".format(self.engine.dialect.name))
+            partitions = None
+        base.metadata.info.update(materialized_views=materialized_views, partitions=partitions)
+        try:
+            base.metadata.create_all(self.connection)
+        finally:
+            for key in ['materialized_views', 'partitions']:
+                del base.metadata.info[key]
+        self.create_indexes(base)
+        self.create_action_indexes(getattr(self.settings, 'ACTION_INDEXES', []))
+
+    def index_names(self, table_name):
+        """
+        Retrieve names of the indexes of a database table, including partitioned tables.
+
+        :param table_name: Name of table.
+        :return: Set of index names.
+        """
+        try:
+            return {index['name'] for index in inspect(self.connection).get_indexes(table_name)}
+        except NoSuchTableError:
+            if self.engine.dialect.name != 'postgresql':
+                raise
+            return {rec[0] for rec in self.connection.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = :name"), name=table_name)}
+
+    def create_indexes(self, base):
+        """
+        Create indexes of the data models that are missing from existing database tables.
+
+        :param base: Declarative base of the Marcotti schema.
+        """
+        for table in base.metadata.sorted_tables:
+            existing = self.index_names(table.name)
+            for index in table.indexes:
+                if index.name not in existing:
+                    logger.info("Creating index {} on {}".format(index.name, table.name))
+                    try:
+                        index.create(self.connection)
+                    except DBAPIError:
+                        logger.exception("Index {} not created".format(index.name))
+
+    def create_action_indexes(self, action_types):
+        """
+        Create partial indexes on the event IDs of match actions of frequently queried types.
+
+        Each index covers the actions of one type only, so that views and analytics that filter
+        match actions by type do not scan the actions of all types.  Partial indexes are supported by
+        PostgreSQL and SQLite databases.
+
+        :param action_types: List of action type names, e.g. ['Goal', 'Card', 'Foul', 'End Period'].
+        """
+        if not action_types:
+            return
+        if self.engine.dialect.name not in ('postgresql', 'sqlite'):
+            logger.warning("Partial indexes not supported by {} databases".format(self.engine.dialect.name))
+            return
+        existing = self.index_names(MatchActions.__tablename__)
+        for action_type in [ActionType.from_string(name) for name in action_types]:
+            index_name = "{}_{}_indx".format(MatchActions.__tablename__, action_type.name)
+            if index_name in existing:
+                continue
+            logger.info("Creating index {} on {} actions".format(index_name, action_type.value))
+            self.connection.execute(DDL("CREATE INDEX {} ON {} (event_id) WHERE type = '{}'".format(
+                index_name, MatchActions.__tablename__, action_type.value)))
+
+    def check_indexes(self, predicates=None):
+        """
+        Report query predicates that are not covered by any index of the database.
+
+        A predicate is covered by a primary key or index whose leading columns are the predicate's columns.
+
+        :param predicates: List of (data model, column names) tuples.  Defaults to the lookups made by
+                           :class:`MarcottiEventTransform`.
+        :return: List of uncovered predicates.
+        """
+        inspector = inspect(self.connection)
+        uncovered = []
+        for model, columns in predicates or MarcottiEventTransform.LOOKUP_PREDICATES:
+            table_name = model.__table__.name
+            keys = [index['column_names'] for index in inspector.get_indexes(table_name)]
+            keys.append(inspector.get_pk_constraint(table_name)['constrained_columns'])
+            if not any(set(key[:len(columns)]) == set(columns) for key in keys):
+                logger.warning("No index on {} covers ({})".format(table_name, ', '.join(columns)))
+                uncovered.append((model, columns))
+        return uncovered
+
+    def convert_guids(self, base):
+        """
+        Convert GUID values stored as hex strings by earlier versions of Marcotti-Events into
+        16-byte binary values.  Required once for existing databases other than PostgreSQL.
+
+        :param base: Declarative base of the Marcotti schema.
+        """
+        logger.info("Converting GUID values to binary storage")
+        count = convert_guids(self.connection, base.metadata)
+        logger.info("{} GUID values converted".format(count))
+
+    def store_full_names(self):
+        """
+        Add the stored full name column to the persons table of an existing database and fill it in
+        for persons without one.  Required once for databases created by earlier versions of
+        Marcotti-Events.
+        """
+        columns = [column['name'] for column in inspect(self.connection).get_columns(Persons.__tablename__)]
+        if 'full_name' not in columns:
+            logger.info("Adding full name column to persons")
+            column = Persons.__table__.c.full_name
+            self.connection.execute("ALTER TABLE {} ADD COLUMN {} {}".format(
+                Persons.__tablename__, column.name, column.type.compile(dialect=self.engine.dialect)))
+            for index in Persons.__table__.indexes:
+                if 'full_name' in index.columns:
+                    index.create(self.connection)
+        result = self.connection.execute(
+            Persons.__table__.update().where(Persons.__table__.c.full_name == None).
+            values(full_name=Persons.full_name.expression))
+        logger.info("{} person full names stored".format(result.rowcount))
+
+    def refresh_views(self):
+        """
+        Rebuild all rows of the event views that are materialized as summary tables.
+        """
+        names = materialized_views(self.connection)
+        logger.info("Refreshing {}".format(', '.join(names) or "no materialized views"))
+        with self.connection.begin():
+            refresh_views(self.connection, names)
+
+    def validate_actions(self, repair=False):
+        """
+        Check that the match, team, period and time fields copied to match actions agree with the
+        match events of the actions.  Required after match events are edited, and once for match
+        actions loaded by earlier versions of Marcotti-Events.
+
+        :param repair: If True, copy the event fields to inconsistent match actions.
+        :return: Number of inconsistent match actions found.
+        """
+        actions = MatchActions.__table__
+        events = event_fields().alias()
+        fields = ['match_id', 'team_id', 'period', 'period_secs']
+        inconsistent = select([actions.c.id]).select_from(actions.join(events, actions.c.event_id == events.c.id)).\
+            where(or_(*[or_(actions.c[field] != events.c[field],
+                            and_(actions.c[field] == None, events.c[field] != None),
+                            and_(actions.c[field] != None, events.c[field] == None)) for field in fields]))
+        count = self.connection.execute(select([func.count()]).select_from(inconsistent.alias())).scalar()
+        logger.info("{} match actions inconsistent with their events".format(count))
+        if repair and count:
+            with self.connection.begin():
+                self.connection.execute(actions.update().where(actions.c.id.in_(inconsistent.correlate(None))).values(
+                    {field: select([events.c[field]]).where(events.c.id == actions.c.event_id).as_scalar()
+                     for field in fields}))
+            logger.info("{} match actions repaired".format(count))
+        return count
 
     def initial_load(self, lang=None):
         """
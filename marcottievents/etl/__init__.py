@@ -1 +1 @@
-from base import ETL, MarcottiLoad, MarcottiTransform, MarcottiEventTransform
+from base import ETL, ParallelETL, MarcottiLoad, MarcottiTransform, MarcottiEventTransform
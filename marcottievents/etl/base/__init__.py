@@ -1,3 +1,4 @@
 from workflows import ETL
 from transform import MarcottiTransform, MarcottiEventTransform
 from load import MarcottiLoad
+from parallel import ParallelETL
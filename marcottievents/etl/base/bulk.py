@@ -0,0 +1,188 @@
+import logging
+from io import BytesIO
+
+from sqlalchemy.orm import class_mapper
+from sqlalchemy.sql.expression import Insert
+from sqlalchemy.ext.compiler import compiles
+
+
+logger = logging.getLogger(__name__)
+
+
+class InsertIgnore(Insert):
+    """
+    INSERT statement that skips rows which violate a primary key or unique constraint.
+
+    Compiled to the native syntax of PostgreSQL (9.5+), SQLite and MySQL.
+    """
+
+
+@compiles(InsertIgnore, 'postgresql')
+def insert_ignore_postgresql(insert, compiler, **kw):
+    return compiler.visit_insert(insert, **kw) + " ON CONFLICT DO NOTHING"
+
+
+@compiles(InsertIgnore, 'sqlite')
+def insert_ignore_sqlite(insert, compiler, **kw):
+    return compiler.visit_insert(insert, **kw).replace("INSERT", "INSERT OR IGNORE", 1)
+
+
+@compiles(InsertIgnore, 'mysql')
+def insert_ignore_mysql(insert, compiler, **kw):
+    return compiler.visit_insert(insert, **kw).replace("INSERT", "INSERT IGNORE", 1)
+
+
+def supports_insert_ignore(dialect):
+    """
+    Check if database supports :class:`InsertIgnore` statements.
+
+    :param dialect: SQLAlchemy dialect object.
+    :return: True if supported.
+    """
+    if dialect.name == 'postgresql':
+        return (dialect.server_version_info or (0,)) >= (9, 5)
+    return dialect.name in ('sqlite', 'mysql')
+
+
+def table_rows(model, records):
+    """
+    Split dictionaries of model fields into rows of each table that the model is mapped to.
+
+    Joined-table inheritance models are mapped to a base table and a subclass table, so a record
+    produces one row in each table, starting with the base table.  Python-side column defaults and
+    the polymorphic identity of the model are filled in.
+
+    :param model: Marcotti data model.
+    :param records: List of dictionaries keyed by model attribute names.
+    :return: List of (table, rows) tuples.
+    """
+    mapper = class_mapper(model)
+    tables = [m.local_table for m in reversed(list(mapper.iterate_to_root())) if m.local_table is not None]
+    table_list = []
+    for table in tables:
+        fields = []
+        for column in table.columns:
+            if mapper.polymorphic_on is not None and column is mapper.polymorphic_on:
+                fields.append((column.key, None, mapper.polymorphic_identity))
+                continue
+            key = mapper.get_property_by_column(column).key
+            default = column.default
+            if default is not None and not (default.is_scalar or default.is_callable):
+                default = None
+            fields.append((column.key, key, default))
+        rows = []
+        for record in records:
+            row = {}
+            for column_key, key, default in fields:
+                if key is None:
+                    row[column_key] = default
+                elif key in record:
+                    row[column_key] = record[key]
+                elif default is None:
+                    row[column_key] = None
+                elif default.is_callable:
+                    row[column_key] = record.setdefault(key, default.arg(None))
+                else:
+                    row[column_key] = record.setdefault(key, default.arg)
+            rows.append(row)
+        table_list.append((table, rows))
+    return table_list
+
+
+def csv_field(value):
+    """
+    Format value as a quoted CSV field.  None becomes an unquoted empty field, which COPY reads as NULL.
+
+    :param value: Database value after bind processing.
+    :return: UTF-8 encoded string.
+    """
+    if value is None:
+        return b''
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    elif isinstance(value, float):
+        value = repr(value)
+    elif not isinstance(value, bytes):
+        value = str(value)
+    return b'"' + value.replace(b'"', b'""') + b'"'
+
+
+def copy_rows(session, table, rows):
+    """
+    Load rows into a PostgreSQL table with COPY FROM STDIN, streamed from an in-memory CSV buffer.
+
+    Values are converted with the bind processors of the table's column types, so that GUIDs and
+    enumerated types are written as the database expects.
+
+    :param session: Database session.
+    :param table: Table object.
+    :param rows: List of dictionaries keyed by column name.
+    """
+    dialect = session.get_bind().dialect
+    columns = list(table.columns)
+    processors = [column.type._cached_bind_processor(dialect) for column in columns]
+    buf = BytesIO()
+    for row in rows:
+        values = [row[column.key] for column in columns]
+        buf.write(b','.join(csv_field(proc(value) if proc and value is not None else value)
+                            for proc, value in zip(processors, values)))
+        buf.write(b'\n')
+    buf.seek(0)
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        dialect.identifier_preparer.format_table(table),
+        ', '.join(dialect.identifier_preparer.format_column(column) for column in columns))
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(statement, buf)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(session, model, records, copy=True):
+    """
+    Insert records of a data model with as few database round trips as possible.
+
+    PostgreSQL databases accessed through psycopg2 are loaded with COPY; other databases receive one
+    executemany INSERT per table.  Records are inserted in the current transaction of the session,
+    so the caller commits.
+
+    :param session: Database session.
+    :param model: Marcotti data model.
+    :param records: List of dictionaries keyed by model attribute names.
+    :param copy: If False, use executemany INSERT on all databases.
+    """
+    if not records:
+        return
+    session.flush()
+    dialect = session.get_bind().dialect
+    use_copy = copy and dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+    for table, rows in table_rows(model, records):
+        if use_copy:
+            copy_rows(session, table, rows)
+        else:
+            session.execute(table.insert(), rows)
+        logger.info("Inserted {} rows into {}".format(len(rows), table.name))
+
+
+def insert_ignore(session, model, records, chunksize=500):
+    """
+    Insert records of a single-table data model with multi-row :class:`InsertIgnore` statements.
+    Records that conflict with existing rows on a primary key or unique index are skipped by the
+    database, so concurrent loaders can insert the same records safely as long as the table has a
+    unique index on the natural key of the records.
+
+    :param session: Database session.
+    :param model: Marcotti data model mapped to one table.
+    :param records: List of dictionaries keyed by model attribute names.
+    :param chunksize: Number of rows per statement.
+    :return: Number of rows inserted.
+    """
+    if not records:
+        return 0
+    session.flush()
+    inserted = 0
+    for table, rows in table_rows(model, records):
+        for start in range(0, len(rows), chunksize):
+            inserted += session.execute(InsertIgnore(table).values(rows[start:start + chunksize])).rowcount
+        logger.info("Inserted {} of {} rows into {}".format(inserted, len(rows), table.name))
+    return inserted
@@ -1,5 +1,11 @@
 import uuid
 import logging
+from decimal import Decimal
+from datetime import date, datetime, time
+from collections import defaultdict, OrderedDict
+
+import numpy as np
+import pandas as pd
 
 import marcottievents.models.common.enums as enums
 import marcottievents.models.common.suppliers as mcs
@@ -8,7 +14,9 @@ import marcottievents.models.common.personnel as mcp
 import marcottievents.models.common.match as mcm
 import marcottievents.models.common.events as mce
 import marcottievents.models.club as mc
+from marcottievents.models import materialized_views, refresh_views
 from .workflows import WorkflowBase
+from . import bulk
 
 
 logger = logging.getLogger(__name__)
@@ -17,26 +25,229 @@ logger = logging.getLogger(__name__)
 class MarcottiLoad(WorkflowBase):
     """
     Load transformed data into database.
+
+    Existence checks are batched by default (see :meth:`records_exist`).  Set ``BATCH_EXISTS`` to False
+    to fall back to one query per record.
+
+    Match events and actions are written with :meth:`bulk_insert`, which uses COPY on PostgreSQL
+    databases.  Set ``COPY_LOAD`` to False to use executemany INSERT statements instead.
+
+    Event views that the database materializes as summary tables are refreshed for the matches
+    whose actions are loaded (see :meth:`refresh_views`).
+
+    Each loading step commits the records it loads.  Set ``COMMIT_STEPS`` to False to flush them
+    instead, so that the caller can commit or roll back several steps in one transaction.
     """
+    BATCH_EXISTS = True
+    BATCH_SIZE = 500
+    COPY_LOAD = True
+    COMMIT_STEPS = True
+
+    def __init__(self, session, supplier):
+        super(MarcottiLoad, self).__init__(session, supplier)
+        self._views = None
+
+    @property
+    def views(self):
+        """
+        Materialized event views in the database, inspected when first needed.
+        """
+        if self._views is None:
+            self._views = materialized_views(self.session.connection())
+        return self._views
+
+    def commit(self):
+        if self.COMMIT_STEPS:
+            self.session.commit()
+        else:
+            self.session.flush()
+
+    def bulk_insert(self, model, records):
+        """
+        Insert dictionaries of model fields in bulk, bypassing the ORM.
+
+        :param model: Marcotti data model.
+        :param records: List of dictionaries keyed by model attribute names.
+        """
+        bulk.bulk_insert(self.session, model, records, copy=self.COPY_LOAD)
+
+    @staticmethod
+    def iter_records(data_frame, fields=None):
+        """
+        Iterate over rows of a DataFrame as dictionaries.
+
+        Rows are read with itertuples(), which avoids the Series that iterrows() constructs for every row.
+        The column subset is computed once per frame.
+
+        :param data_frame: DataFrame of transformed data.
+        :param fields: List of fields to retrieve, or None for all columns.  Fields that are not
+                       columns of the DataFrame are skipped.
+        :return: Generator of dictionaries keyed by column name.
+        """
+        columns = [field for field in fields if field in data_frame.columns] if fields else list(data_frame.columns)
+        for values in data_frame[columns].itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+
+    def insert_maps(self, model, records, entity=None, dependents=(), created=None):
+        """
+        Insert remote ID mappings, skipping those that already exist.
+
+        Uses the database's INSERT ... ON CONFLICT DO NOTHING (or INSERT OR IGNORE) where available,
+        so that loaders can be re-run cheaply and run concurrently.  Otherwise mappings that already
+        exist are filtered out with :meth:`records_exist` before they are inserted.  Concurrent loaders
+        rely on the unique (supplier_id, remote_id) index of the mapper tables to skip each other's mappings.
+
+        A mapping is skipped if its remote ID is mapped already, by a concurrent loader or by an earlier
+        record of the same feed.  If the mapped records were created by the loader, the records whose
+        mappings were skipped are left orphaned, and are deleted.
+
+        :param model: Mapper data model.
+        :param records: List of dictionaries with id, remote_id and supplier_id fields.
+        :param entity: Data model of the mapped records, if they were created for the mappings.
+        :param dependents: Foreign key columns of records that refer to the created records, which are
+                           deleted with them.
+        :param created: IDs of the created records, or None if all mapped records were created.
+        """
+        unique_records = OrderedDict()
+        for record in records:
+            unique_records.setdefault((record['remote_id'], record['supplier_id']), record)
+        unique = list(unique_records.values())
+        if bulk.supports_insert_ignore(self.session.get_bind().dialect):
+            inserted = bulk.insert_ignore(self.session, model, unique, chunksize=self.BATCH_SIZE)
+        else:
+            exists = self.records_exist(model, [dict(remote_id=rec['remote_id'], supplier_id=rec['supplier_id'])
+                                                for rec in unique])
+            new_records = [rec for rec, exist in zip(unique, exists) if not exist]
+            self.bulk_insert(model, new_records)
+            inserted = len(new_records)
+        if entity is not None and inserted < len(records):
+            ids = [rec['id'] for rec in records] if created is None else list(created)
+            self.delete_unmapped(model, entity, ids, dependents)
+
+    def delete_unmapped(self, model, entity, ids, dependents=()):
+        """
+        Delete records that have no remote ID mapping, together with the records that refer to them.
+
+        :param model: Mapper data model.
+        :param entity: Data model of the records.
+        :param ids: List of record IDs.
+        :param dependents: Foreign key columns of records that refer to the records.
+        :return: List of IDs of deleted records.
+        """
+        mapped = set()
+        for start in range(0, len(ids), self.BATCH_SIZE):
+            chunk = ids[start:start + self.BATCH_SIZE]
+            mapped.update(rec.id for rec in self.session.query(model.id).filter(model.id.in_(chunk)))
+        orphans = [record_id for record_id in set(ids) if record_id not in mapped]
+        for start in range(0, len(orphans), self.BATCH_SIZE):
+            chunk = orphans[start:start + self.BATCH_SIZE]
+            for column in dependents:
+                self.session.query(column.class_).filter(column.in_(chunk)).delete(synchronize_session=False)
+            for record in self.session.query(entity).filter(entity.id.in_(chunk)):
+                self.session.delete(record)
+        if orphans:
+            self.session.flush()
+            logger.info("Deleted {} {} records without remote ID mappings".format(
+                len(orphans), entity.__name__))
+        return orphans
+
     def record_exists(self, model, **conditions):
         return self.session.query(model).filter_by(**conditions).count() != 0
 
+    def records_exist(self, model, conditions_list):
+        """
+        Batched counterpart of :meth:`record_exists`.
+
+        Records are grouped by the fields that appear in their query conditions.  For each group the
+        database records that could match are retrieved with IN queries on the most selective field,
+        and the existence checks are made against the resulting set of natural keys.
+
+        :param model: Marcotti data model.
+        :param conditions_list: List of query condition dictionaries, one per record.
+        :return: List of booleans, True if the record exists in the database.
+        """
+        if not self.BATCH_EXISTS:
+            return [self.record_exists(model, **conditions) for conditions in conditions_list]
+        groups = defaultdict(list)
+        for indx, conditions in enumerate(conditions_list):
+            groups[tuple(sorted(conditions))].append(indx)
+        exists = [False] * len(conditions_list)
+        for fields, indices in groups.items():
+            if not fields:
+                table_populated = self.session.query(model).count() != 0
+                for indx in indices:
+                    exists[indx] = table_populated
+                continue
+            keys = [tuple(self.key_value(conditions_list[indx][field]) for field in fields) for indx in indices]
+            existing_keys = self.natural_keys(model, fields, keys)
+            for indx, key in zip(indices, keys):
+                exists[indx] = key in existing_keys
+        return exists
+
+    def natural_keys(self, model, fields, keys):
+        """
+        Retrieve natural keys of database records that share a lead field value with a set of candidate keys.
+
+        The lead field is the field with the most distinct values among the candidate keys.  Its values are
+        queried in batches of ``BATCH_SIZE``.
+
+        :param model: Marcotti data model.
+        :param fields: Tuple of model fields that make up the natural key.
+        :param keys: List of candidate key tuples, in the order of `fields`.
+        :return: Set of key tuples present in the database.
+        """
+        lead = max(range(len(fields)), key=lambda k: len(set(key[k] for key in keys)))
+        lead_values = list(set(key[lead] for key in keys))
+        existing_keys = set()
+        for start in range(0, len(lead_values), self.BATCH_SIZE):
+            records = self.session.query(model).filter(
+                getattr(model, fields[lead]).in_(lead_values[start:start+self.BATCH_SIZE]))
+            existing_keys.update(tuple(self.key_value(getattr(rec, field)) for field in fields)
+                                 for rec in records)
+        return existing_keys
+
+    @staticmethod
+    def key_value(value):
+        """
+        Normalize natural key value so that database and data frame values compare equal, as they
+        would in a SQL comparison.
+
+        Decimals become floats and NumPy scalars become Python scalars.  Dates, datetimes, Timestamps
+        and NumPy datetimes become Python datetimes, with dates at midnight.
+
+        :param value: Field value.
+        :return: Normalized value.
+        """
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, np.datetime64):
+            value = pd.Timestamp(value)
+        if isinstance(value, datetime):
+            return pd.Timestamp(value).to_pydatetime()
+        if isinstance(value, date):
+            return datetime.combine(value, time())
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
     def suppliers(self, data_frame):
-        supplier_records = [mcs.Suppliers(**data_row) for idx, data_row in data_frame.iterrows()
-                            if not self.record_exists(mcs.Suppliers, name=data_row['name'])]
+        rows = list(self.iter_records(data_frame))
+        exists = self.records_exist(mcs.Suppliers, [dict(name=row['name']) for row in rows])
+        supplier_records = [mcs.Suppliers(**row) for row, exist in zip(rows, exists) if not exist]
         self.session.add_all(supplier_records)
-        self.session.commit()
+        self.commit()
 
     def years(self, data_frame):
-        year_records = [mco.Years(**data_row) for idx, data_row in data_frame.iterrows()
-                        if not self.record_exists(mco.Years, yr=data_row['yr'])]
+        rows = list(self.iter_records(data_frame))
+        exists = self.records_exist(mco.Years, [dict(yr=row['yr']) for row in rows])
+        year_records = [mco.Years(**row) for row, exist in zip(rows, exists) if not exist]
         self.session.add_all(year_records)
-        self.session.commit()
+        self.commit()
 
     def seasons(self, data_frame):
         season_records = []
         map_records = []
-        for idx, row in data_frame.iterrows():
+        for row in self.iter_records(data_frame):
             if 'name' not in row:
                 if row['start_year'] == row['end_year']:
                     yr_obj = self.session.query(mco.Years).filter_by(yr=row['start_year']).one()
@@ -49,34 +260,36 @@ class MarcottiLoad(WorkflowBase):
                         season_records.append(mco.Seasons(start_year=start_yr_obj, end_year=end_yr_obj))
                 self.session.add_all(season_records)
             else:
-                if not self.record_exists(mcs.SeasonMap, remote_id=row['remote_id'], supplier_id=self.supplier_id):
-                    map_records.append(mcs.SeasonMap(id=self.get_id(mco.Seasons, name=row['name']),
-                                                     remote_id=row['remote_id'],
-                                                     supplier_id=self.supplier_id))
-                self.session.add_all(map_records)
-        self.session.commit()
+                map_records.append(dict(id=self.get_season_id(row['name']),
+                                        remote_id=row['remote_id'], supplier_id=self.supplier_id))
+        if season_records:
+            self.season_labels.clear()
+        self.insert_maps(mcs.SeasonMap, map_records)
+        self.commit()
 
     def countries(self, data_frame):
         remote_ids = []
         country_records = []
         fields = ['name', 'code', 'confederation']
-        for idx, row in data_frame.iterrows():
+        rows = list(self.iter_records(data_frame))
+        exists = self.records_exist(mco.Countries, [dict(name=row['name']) for row in rows])
+        for row, exist in zip(rows, exists):
             country_dict = {field: row[field] for field in fields if row[field]}
-            if not self.record_exists(mco.Countries, name=row['name']):
+            if not exist:
                 country_records.append(mco.Countries(**country_dict))
                 remote_ids.append(row['remote_id'])
         self.session.add_all(country_records)
-        self.session.commit()
-        map_records = [mcs.CountryMap(id=country_record.id, remote_id=remote_id, supplier_id=self.supplier_id)
+        self.commit()
+        map_records = [dict(id=country_record.id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, country_record in zip(remote_ids, country_records) if remote_id]
-        self.session.add_all(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.CountryMap, map_records, mco.Countries)
+        self.commit()
 
     def competitions(self, data_frame):
         remote_ids = []
         local_ids = []
         comp_records = []
-        for idx, row in data_frame.iterrows():
+        for row in self.iter_records(data_frame):
             if 'country_id' in data_frame.columns:
                 fields = ['name', 'level', 'country_id']
                 comp_dict = {field: row[field] for field in fields if row[field]}
@@ -94,28 +307,30 @@ class MarcottiLoad(WorkflowBase):
                     remote_ids.append(row['remote_id'])
                     local_ids.append(comp_dict['id'])
         self.session.bulk_save_objects(comp_records)
-        map_records = [mcs.CompetitionMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.CompetitionMap, map_records, mco.Competitions)
+        self.commit()
 
     def clubs(self, data_frame):
         remote_ids = []
         local_ids = []
         club_records = []
         fields = ['short_name', 'name', 'country_id']
-        for idx, row in data_frame.iterrows():
-            club_dict = {field: row[field] for field in fields if row[field]}
-            if not self.record_exists(mc.Clubs, **club_dict):
+        rows = list(self.iter_records(data_frame))
+        club_dicts = [{field: row[field] for field in fields if row[field]} for row in rows]
+        exists = self.records_exist(mc.Clubs, club_dicts)
+        for row, club_dict, exist in zip(rows, club_dicts, exists):
+            if not exist:
                 club_dict.update(id=uuid.uuid4())
                 club_records.append(mc.Clubs(**club_dict))
                 remote_ids.append(row['remote_id'])
                 local_ids.append(club_dict['id'])
         self.session.bulk_save_objects(club_records)
-        map_records = [mc.ClubMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mc.ClubMap, map_records, mc.Clubs)
+        self.commit()
 
     def venues(self, data_frame):
         remote_ids = []
@@ -124,9 +339,11 @@ class MarcottiLoad(WorkflowBase):
         history_records = []
         fields = ['name', 'city', 'region', 'latitude', 'longitude', 'altitude', 'country_id', 'timezone_id']
         history_fields = ['eff_date', 'length', 'width', 'capacity', 'seats', 'surface_id']
-        for idx, row in data_frame.iterrows():
-            venue_dict = {field: row[field] for field in fields if row[field]}
-            if not self.record_exists(mco.Venues, **venue_dict):
+        rows = list(self.iter_records(data_frame))
+        venue_dicts = [{field: row[field] for field in fields if row[field]} for row in rows]
+        exists = self.records_exist(mco.Venues, venue_dicts)
+        for row, venue_dict, exist in zip(rows, venue_dicts, exists):
+            if not exist:
                 venue_dict.update(id=uuid.uuid4())
                 venue_records.append(mco.Venues(**venue_dict))
                 history_dict = {field: row[field] for field in history_fields if row[field]}
@@ -136,22 +353,24 @@ class MarcottiLoad(WorkflowBase):
         self.session.bulk_save_objects(venue_records)
         self.session.bulk_save_objects(history_records)
 
-        map_records = [mcs.VenueMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.VenueMap, map_records, mco.Venues, [mco.VenueHistory.venue_id])
+        self.commit()
 
     def surfaces(self, data_frame):
-        surface_records = [mco.Surfaces(**row) for indx, row in data_frame.iterrows()
-                           if not self.record_exists(mco.Surfaces, description=row['description'])]
+        rows = list(self.iter_records(data_frame))
+        exists = self.records_exist(mco.Surfaces, [dict(description=row['description']) for row in rows])
+        surface_records = [mco.Surfaces(**row) for row, exist in zip(rows, exists) if not exist]
         self.session.add_all(surface_records)
-        self.session.commit()
+        self.commit()
 
     def timezones(self, data_frame):
-        tz_records = [mco.Timezones(**row) for indx, row in data_frame.iterrows()
-                      if not self.record_exists(mco.Timezones, name=row['name'])]
+        rows = list(self.iter_records(data_frame))
+        exists = self.records_exist(mco.Timezones, [dict(name=row['name']) for row in rows])
+        tz_records = [mco.Timezones(**row) for row, exist in zip(rows, exists) if not exist]
         self.session.add_all(tz_records)
-        self.session.commit()
+        self.commit()
 
     def players(self, data_frame):
         player_set = set()
@@ -163,16 +382,19 @@ class MarcottiLoad(WorkflowBase):
                   'nick_name', 'birth_date', 'order', 'country_id', 'position_id', 'remote_id',
                   'remote_country_id']
 
-        for _, row in data_frame.iterrows():
+        for row in self.iter_records(data_frame, fields):
             player_set.add(tuple([(field, row[field]) for field in fields
                                   if field in row and row[field] is not None]))
         logger.info("{} players in data feed".format(len(player_set)))
-        for elements in player_set:
-            player_dict = dict(elements)
-            remote_id = player_dict.pop('remote_id')
-            remote_country_id = player_dict.pop('remote_country_id', None)
-            if not self.record_exists(mcs.PlayerMap, remote_id=remote_id):
-                if not self.record_exists(mcp.Players, **player_dict):
+        player_dicts = [dict(elements) for elements in player_set]
+        remote_keys = [player_dict.pop('remote_id') for player_dict in player_dicts]
+        remote_countrykeys = [player_dict.pop('remote_country_id', None) for player_dict in player_dicts]
+        map_exists = self.records_exist(mcs.PlayerMap, [dict(remote_id=remote_id) for remote_id in remote_keys])
+        player_exists = self.records_exist(mcp.Players, player_dicts)
+        for player_dict, remote_id, remote_country_id, map_exist, player_exist in zip(
+                player_dicts, remote_keys, remote_countrykeys, map_exists, player_exists):
+            if not map_exist:
+                if not player_exist:
                     player_dict.update(id=uuid.uuid4(), person_id=uuid.uuid4())
                     player_records.append(mcp.Players(**player_dict))
                     local_ids.append(player_dict['id'])
@@ -184,7 +406,7 @@ class MarcottiLoad(WorkflowBase):
                     remote_ids.append(remote_id)
             else:
                 player_id = self.session.query(mcs.PlayerMap).filter_by(remote_id=remote_id).one().id
-                if not self.record_exists(mcp.Players, **player_dict):
+                if not player_exist:
                     updated_records = self.session.query(mcp.Players).\
                         filter(mcp.Players.person_id == mcp.Persons.person_id).\
                         filter(mcp.Players.id == player_id)
@@ -192,21 +414,20 @@ class MarcottiLoad(WorkflowBase):
                         for field, value in player_dict.items():
                             setattr(rec, field, value)
         if self.session.dirty:
-            self.session.commit()
+            self.commit()
 
         logger.info("{} player records ingested".format(len(player_records)))
-        self.session.bulk_save_objects(player_records)
-        map_records = [mcs.PlayerMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        self.session.bulk_save_objects(self.store_full_names(player_records))
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.PlayerMap, map_records, mcp.Players,
+                         created=[rec.id for rec in player_records])
+        self.commit()
 
-        for remote_id, player_record in zip(remote_countryids, player_records):
-            if remote_id and not self.record_exists(mcs.CountryMap, remote_id=remote_id,
-                                                    supplier_id=self.supplier_id):
-                self.session.add(mcs.CountryMap(id=player_record.country_id, remote_id=remote_id,
-                                                supplier_id=self.supplier_id))
-                self.session.commit()
+        country_map_records = [dict(id=player_record.country_id, remote_id=remote_id, supplier_id=self.supplier_id)
+                               for remote_id, player_record in zip(remote_countryids, player_records) if remote_id]
+        self.insert_maps(mcs.CountryMap, country_map_records)
+        self.commit()
 
     def managers(self, data_frame):
         manager_records = []
@@ -214,10 +435,13 @@ class MarcottiLoad(WorkflowBase):
         local_ids = []
         fields = ['known_first_name', 'first_name', 'middle_name', 'last_name', 'second_last_name',
                   'nick_name', 'birth_date', 'order', 'country_id']
-        for indx, row in data_frame.iterrows():
-            manager_dict = {field: row[field] for field in fields if field in row and row[field]}
-            if not self.record_exists(mcs.ManagerMap, remote_id=row['remote_id']):
-                if not self.record_exists(mcp.Managers, **manager_dict):
+        rows = list(self.iter_records(data_frame))
+        manager_dicts = [{field: row[field] for field in fields if field in row and row[field]} for row in rows]
+        map_exists = self.records_exist(mcs.ManagerMap, [dict(remote_id=row['remote_id']) for row in rows])
+        manager_exists = self.records_exist(mcp.Managers, manager_dicts)
+        for row, manager_dict, map_exist, manager_exist in zip(rows, manager_dicts, map_exists, manager_exists):
+            if not map_exist:
+                if not manager_exist:
                     manager_dict.update(id=uuid.uuid4(), person_id=uuid.uuid4())
                     manager_records.append(mcp.Managers(**manager_dict))
                     local_ids.append(manager_dict['id'])
@@ -228,7 +452,7 @@ class MarcottiLoad(WorkflowBase):
                     remote_ids.append(row['remote_id'])
             else:
                 manager_id = self.session.query(mcs.ManagerMap).filter_by(remote_id=row['remote_id']).one().id
-                if not self.record_exists(mcp.Managers, **manager_dict):
+                if not manager_exist:
                     updated_records = self.session.query(mcp.Managers).\
                         filter(mcp.Managers.person_id == mcp.Persons.person_id).\
                         filter(mcp.Managers.id == manager_id)
@@ -236,13 +460,14 @@ class MarcottiLoad(WorkflowBase):
                         for field, value in manager_dict.items():
                             setattr(rec, field, value)
         if self.session.dirty:
-            self.session.commit()
+            self.commit()
 
-        self.session.bulk_save_objects(manager_records)
-        map_records = [mcs.ManagerMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        self.session.bulk_save_objects(self.store_full_names(manager_records))
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.ManagerMap, map_records, mcp.Managers,
+                         created=[rec.id for rec in manager_records])
+        self.commit()
 
     def referees(self, data_frame):
         referee_records = []
@@ -250,10 +475,13 @@ class MarcottiLoad(WorkflowBase):
         local_ids = []
         fields = ['known_first_name', 'first_name', 'middle_name', 'last_name', 'second_last_name',
                   'nick_name', 'birth_date', 'order', 'country_id']
-        for indx, row in data_frame.iterrows():
-            referee_dict = {field: row[field] for field in fields if field in row and row[field]}
-            if not self.record_exists(mcs.RefereeMap, remote_id=row['remote_id']):
-                if not self.record_exists(mcp.Referees, **referee_dict):
+        rows = list(self.iter_records(data_frame))
+        referee_dicts = [{field: row[field] for field in fields if field in row and row[field]} for row in rows]
+        map_exists = self.records_exist(mcs.RefereeMap, [dict(remote_id=row['remote_id']) for row in rows])
+        referee_exists = self.records_exist(mcp.Referees, referee_dicts)
+        for row, referee_dict, map_exist, referee_exist in zip(rows, referee_dicts, map_exists, referee_exists):
+            if not map_exist:
+                if not referee_exist:
                     referee_dict.update(id=uuid.uuid4(), person_id=uuid.uuid4())
                     referee_records.append(mcp.Referees(**referee_dict))
                     remote_ids.append(row['remote_id'])
@@ -264,7 +492,7 @@ class MarcottiLoad(WorkflowBase):
                     remote_ids.append(row['remote_id'])
             else:
                 referee_id = self.session.query(mcs.RefereeMap).filter_by(remote_id=row['remote_id']).one().id
-                if not self.record_exists(mcp.Referees, **referee_dict):
+                if not referee_exist:
                     updated_records = self.session.query(mcp.Referees). \
                         filter(mcp.Referees.person_id == mcp.Persons.person_id). \
                         filter(mcp.Referees.id == referee_id)
@@ -272,27 +500,28 @@ class MarcottiLoad(WorkflowBase):
                         for field, value in referee_dict.items():
                             setattr(rec, field, value)
         if self.session.dirty:
-            self.session.commit()
+            self.commit()
 
-        self.session.bulk_save_objects(referee_records)
-        map_records = [mcs.RefereeMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        self.session.bulk_save_objects(self.store_full_names(referee_records))
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.RefereeMap, map_records, mcp.Referees,
+                         created=[rec.id for rec in referee_records])
+        self.commit()
 
     def positions(self, data_frame):
         position_record = []
-        for indx, row in data_frame.iterrows():
+        map_records = []
+        for row in self.iter_records(data_frame):
             if row['remote_id'] and self.supplier_id:
-                if not self.record_exists(mcs.PositionMap, remote_id=row['remote_id'], supplier_id=self.supplier_id):
-                    position_record.append(mcs.PositionMap(
-                        id=self.get_id(mcp.Positions, name=row['name']),
-                        remote_id=row['remote_id'], supplier_id=self.supplier_id))
+                map_records.append(dict(id=self.get_id(mcp.Positions, name=row['name']),
+                                        remote_id=row['remote_id'], supplier_id=self.supplier_id))
             else:
                 if not self.record_exists(mcp.Positions, name=row['name']):
                     position_record.append(mcp.Positions(name=row['name'], type=row['type']))
         self.session.add_all(position_record)
-        self.session.commit()
+        self.insert_maps(mcs.PositionMap, map_records)
+        self.commit()
 
     def league_matches(self, data_frame):
         condition_records = []
@@ -303,11 +532,14 @@ class MarcottiLoad(WorkflowBase):
                   'home_manager_id', 'away_manager_id', 'referee_id', 'attendance', 'matchday']
         condition_fields = ['kickoff_time', 'kickoff_temp', 'kickoff_humidity',
                             'kickoff_weather', 'halftime_weather', 'fulltime_weather']
-        for idx, row in data_frame.iterrows():
-            match_dict = {field: row[field] for field in fields if field in row and row[field] is not None}
+        rows = list(self.iter_records(data_frame))
+        match_dicts = [{field: row[field] for field in fields if field in row and row[field] is not None}
+                       for row in rows]
+        exists = self.records_exist(mc.ClubLeagueMatches, match_dicts)
+        for row, match_dict, exist in zip(rows, match_dicts, exists):
             condition_dict = {field: row[field] for field in condition_fields
                               if field in row and row[field] is not None}
-            if not self.record_exists(mc.ClubLeagueMatches, **match_dict):
+            if not exist:
                 match_dict.update(id=uuid.uuid4())
                 match_records.append(mc.ClubLeagueMatches(**match_dict))
                 condition_records.append(mcm.MatchConditions(id=match_dict['id'], **condition_dict))
@@ -317,10 +549,10 @@ class MarcottiLoad(WorkflowBase):
         self.session.bulk_save_objects(match_records)
         self.session.bulk_save_objects(condition_records)
 
-        map_records = [mcs.MatchMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.MatchMap, map_records, mcm.Matches, [mcm.MatchConditions.id])
+        self.commit()
 
     def knockout_matches(self, data_frame):
         condition_records = []
@@ -332,11 +564,14 @@ class MarcottiLoad(WorkflowBase):
                   'extra_time']
         condition_fields = ['kickoff_time', 'kickoff_temp', 'kickoff_humidity',
                             'kickoff_weather', 'halftime_weather', 'fulltime_weather']
-        for idx, row in data_frame.iterrows():
-            match_dict = {field: row[field] for field in fields if field in row and row[field] is not None}
+        rows = list(self.iter_records(data_frame))
+        match_dicts = [{field: row[field] for field in fields if field in row and row[field] is not None}
+                       for row in rows]
+        exists = self.records_exist(mc.ClubKnockoutMatches, match_dicts)
+        for row, match_dict, exist in zip(rows, match_dicts, exists):
             condition_dict = {field: row[field] for field in condition_fields
                               if field in row and row[field] is not None}
-            if not self.record_exists(mc.ClubKnockoutMatches, **match_dict):
+            if not exist:
                 match_dict.update(id=uuid.uuid4())
                 match_records.append(mc.ClubKnockoutMatches(**match_dict))
                 condition_records.append(mcm.MatchConditions(id=match_dict['id'], **condition_dict))
@@ -346,76 +581,134 @@ class MarcottiLoad(WorkflowBase):
         self.session.bulk_save_objects(match_records)
         self.session.bulk_save_objects(condition_records)
 
-        map_records = [mcs.MatchMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.MatchMap, map_records, mcm.Matches, [mcm.MatchConditions.id])
+        self.commit()
 
     def match_lineups(self, data_frame):
         lineup_records = []
         fields = ['match_id', 'player_id', 'team_id', 'position_id', 'is_starting', 'is_captain', 'number']
-        for idx, row in data_frame.iterrows():
-            if not row['player_id']:
-                continue
-            lineup_dict = {field: row[field] for field in fields if row[field] is not None}
-            if not self.record_exists(mc.ClubMatchLineups, **lineup_dict):
+        lineup_dicts = [{field: row[field] for field in fields if row[field] is not None}
+                        for row in self.iter_records(data_frame, fields) if row['player_id']]
+        exists = self.records_exist(mc.ClubMatchLineups, lineup_dicts)
+        for lineup_dict, exist in zip(lineup_dicts, exists):
+            if not exist:
                 lineup_dict.update(id=uuid.uuid4())
                 lineup_records.append(mc.ClubMatchLineups(**lineup_dict))
         self.session.add_all(lineup_records)
-        self.session.commit()
+        self.commit()
 
     def modifiers(self, data_frame):
-        mod_records = [mce.Modifiers(**row) for indx, row in data_frame.iterrows()
-                       if not self.record_exists(mce.Modifiers, type=row['type'])]
+        rows = list(self.iter_records(data_frame))
+        exists = self.records_exist(mce.Modifiers, [dict(type=row['type']) for row in rows])
+        mod_records = [mce.Modifiers(**row) for row, exist in zip(rows, exists) if not exist]
         self.session.add_all(mod_records)
-        self.session.commit()
+        self.commit()
 
     def events(self, data_frame):
         event_set = set()
-        event_records = []
+        event_records = defaultdict(list)
         remote_ids = []
         local_ids = []
         fields = ['timestamp', 'period', 'period_secs', 'x', 'y', 'match_id', 'team_id', 'remote_id']
-        for _, row in data_frame.iterrows():
+        for row in self.iter_records(data_frame, fields):
             event_set.add(tuple([(field, row[field]) for field in fields
                                  if field in row and row[field] is not None]))
         logger.info("{} unique events".format(len(event_set)))
+        unmatched = [dict(elements).get('remote_id') for elements in event_set if 'match_id' not in dict(elements)]
+        if unmatched:
+            raise ValueError("No match IDs of {} events: {}".format(len(unmatched), ', '.join(
+                "{}".format(remote_id) for remote_id in sorted(unmatched))))
         for indx, elements in enumerate(event_set):
             if indx and indx % 100 == 0:
                 logger.info("Processing {} events".format(indx))
             event_dict = dict(elements)
             remote_id = event_dict.pop('remote_id')
-            if 'team_id' not in event_dict:
-                # if not self.record_exists(mce.MatchEvents, **event_dict):
-                event_dict.update(id=uuid.uuid4())
-                event_records.append(mce.MatchEvents(**event_dict))
-                remote_ids.append(remote_id)
-                local_ids.append(event_dict['id'])
-            else:
-                # if not self.record_exists(mc.ClubMatchEvents, **event_dict):
-                event_dict.update(id=uuid.uuid4())
-                event_records.append(mc.ClubMatchEvents(**event_dict))
-                remote_ids.append(remote_id)
-                local_ids.append(event_dict['id'])
-        self.session.bulk_save_objects(event_records)
-
-        map_records = [mcs.MatchEventMap(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
+            event_dict.update(id=uuid.uuid4())
+            model = mc.ClubMatchEvents if 'team_id' in event_dict else mce.MatchEvents
+            event_records[model].append(event_dict)
+            remote_ids.append(remote_id)
+            local_ids.append(event_dict['id'])
+        for model, records in event_records.items():
+            self.bulk_insert(model, records)
+
+        map_records = [dict(id=local_id, remote_id=remote_id, supplier_id=self.supplier_id)
                        for remote_id, local_id in zip(remote_ids, local_ids) if remote_id]
-        self.session.bulk_save_objects(map_records)
-        self.session.commit()
+        self.insert_maps(mcs.MatchEventMap, map_records, mce.MatchEvents)
+        self.commit()
+
+    @staticmethod
+    def store_full_names(records):
+        """
+        Set the stored full names of person records, which bulk saves do not fill in.
+
+        :param records: List of Persons objects.
+        :return: List of Persons objects.
+        """
+        for record in records:
+            record.stored_full_name = record.full_name
+        return records
+
+    def refresh_views(self, match_ids):
+        """
+        Refresh rows of materialized event views for matches whose actions were loaded.
+
+        :param match_ids: Match IDs.
+        """
+        if match_ids and self.views:
+            refresh_views(self.session, self.views, match_ids)
+            logger.info("Refreshed {} for {} matches".format(', '.join(self.views), len(match_ids)))
+
+    def lineup_ids(self, match_ids):
+        """
+        Retrieve lineup IDs of all players in a set of matches.
+
+        :param match_ids: Iterable of match IDs.
+        :return: Dictionary of lineup IDs keyed by (match ID, player ID).
+        """
+        match_ids = list(match_ids)
+        lineup_dict = {}
+        for start in range(0, len(match_ids), self.BATCH_SIZE):
+            records = self.session.query(mcm.MatchLineups.match_id, mcm.MatchLineups.player_id,
+                                         mcm.MatchLineups.id).filter(
+                mcm.MatchLineups.match_id.in_(match_ids[start:start + self.BATCH_SIZE]))
+            lineup_dict.update({(rec.match_id, rec.player_id): rec.id for rec in records})
+        return lineup_dict
+
+    def event_fields(self, match_ids):
+        """
+        Retrieve the match event fields that are copied to match actions, for all events in a set of matches.
+
+        :param match_ids: Iterable of match IDs.
+        :return: Dictionary of field dictionaries keyed by event ID.
+        """
+        match_ids = list(match_ids)
+        fields = mce.event_fields().alias()
+        event_dict = {}
+        for start in range(0, len(match_ids), self.BATCH_SIZE):
+            records = self.session.execute(fields.select().where(
+                fields.c.match_id.in_(match_ids[start:start + self.BATCH_SIZE])))
+            event_dict.update({rec.id: dict(match_id=rec.match_id, team_id=rec.team_id, period=rec.period,
+                                            period_secs=rec.period_secs) for rec in records})
+        return event_dict
 
     def actions(self, data_frame):
         action_set = set()
         action_records = []
-        lineup_dict = None
         modifier_ids = []
         local_ids = []
         action_fields = ['event_id', 'type', 'x_end', 'y_end', 'z_end',
                          'is_success', 'match_id', 'player_id', 'modifier_type']
-        for _, row in data_frame.iterrows():
+        for row in self.iter_records(data_frame, action_fields):
             action_set.add(tuple([(field, row[field]) for field in action_fields
                                   if field in row and row[field] is not None]))
         logger.info("{} unique actions".format(len(action_set)))
+        match_ids = {dict(elements)['match_id'] for elements in action_set}
+        lineup_dict = self.lineup_ids(match_ids)
+        event_dict = self.event_fields(match_ids)
+        modifier_dict = {rec.type: rec.id for rec in self.session.query(mce.Modifiers)}
+        missing_lineups = set()
         for indx, elements in enumerate(action_set):
             if indx and indx % 100 == 0:
                 logger.info("Processing {} actions".format(indx))
@@ -423,28 +716,33 @@ class MarcottiLoad(WorkflowBase):
             match_id = action_dict.pop('match_id')
             player_id = action_dict.pop('player_id', None)
             modifier_type = action_dict.pop('modifier_type', None)
-            if not lineup_dict:
-                records = self.session.query(mcm.MatchLineups).filter_by(match_id=match_id).all()
-                lineup_dict = {rec.player_id: rec.id for rec in records}
             if player_id:
-                action_dict['lineup_id'] = lineup_dict[player_id]
+                try:
+                    action_dict['lineup_id'] = lineup_dict[(match_id, player_id)]
+                except KeyError:
+                    missing_lineups.add((match_id, player_id))
             if modifier_type:
                 try:
-                    modifier_id = self.get_id(mce.Modifiers,
-                                              type=enums.ModifierType.from_string(modifier_type))
+                    modifier_id = modifier_dict.get(enums.ModifierType.from_string(modifier_type))
                 except ValueError as ex:
                     logger.info(elements)
                     raise ex
             else:
                 modifier_id = None
             # if not self.record_exists(mce.MatchActions, **action_dict):
+            action_dict.update(event_dict.get(action_dict['event_id'], dict(match_id=match_id)))
             action_dict.update(id=uuid.uuid4())
-            action_records.append(mce.MatchActions(**action_dict))
+            action_records.append(action_dict)
             modifier_ids.append(modifier_id)
             local_ids.append(action_dict['id'])
-        self.session.bulk_save_objects(action_records)
+        if missing_lineups:
+            raise ValueError("No lineup records of {} players in matches: {}".format(
+                len(missing_lineups), ', '.join("player {} in match {}".format(player_id, match_id)
+                                                for match_id, player_id in sorted(missing_lineups))))
+        self.bulk_insert(mce.MatchActions, action_records)
 
-        modifier_records = [mce.MatchActionModifiers(action_id=local_id, modifier_id=modifier_id)
+        modifier_records = [dict(action_id=local_id, modifier_id=modifier_id)
                             for modifier_id, local_id in zip(modifier_ids, local_ids)]
-        self.session.bulk_save_objects(modifier_records)
-        self.session.commit()
+        self.bulk_insert(mce.MatchActionModifiers, modifier_records)
+        self.refresh_views(match_ids)
+        self.commit()
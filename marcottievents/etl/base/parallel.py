@@ -0,0 +1,127 @@
+import time
+import logging
+from collections import namedtuple, OrderedDict
+from multiprocessing import Pool
+
+from sqlalchemy.orm.session import Session
+
+from .workflows import ETL
+from .transform import MarcottiEventTransform
+from .load import MarcottiLoad
+
+
+logger = logging.getLogger(__name__)
+
+
+MatchResult = namedtuple('MatchResult', ['remote_match_id', 'records', 'seconds', 'error'])
+
+_marcotti = None
+
+
+def partition(records, key='remote_match_id'):
+    """
+    Group extracted records by match.
+
+    :param records: Iterable of record dictionaries.
+    :param key: Record field that identifies the match.
+    :return: Ordered dictionary of record lists keyed by remote match ID.
+    """
+    groups = OrderedDict()
+    for record in records:
+        groups.setdefault(record.get(key), []).append(record)
+    return groups
+
+
+def load_match(session, transform, load, supplier, remote_match_id, feeds):
+    """
+    Transform and load the data of one match in one transaction, then commit.  Failures are rolled
+    back and reported, so that no partial match data is left in the database.
+
+    :param session: Database session.
+    :param transform: Transform class.
+    :param load: Load class.
+    :param supplier: Name of data supplier.
+    :param remote_match_id: Match ID of data supplier.
+    :param feeds: List of (entity, records) tuples, loaded in order.
+    :return: :class:`MatchResult` tuple.
+    """
+    start = time.time()
+    records = 0
+    try:
+        etl = ETL(transform=transform, load=load, session=session, supplier=supplier)
+        etl.loader.COMMIT_STEPS = False
+        for entity, data in feeds:
+            etl.workflow(entity, data)
+            records += len(data)
+        session.commit()
+        error = None
+    except Exception as ex:
+        session.rollback()
+        logger.exception("Match {} not loaded".format(remote_match_id))
+        error = "{}: {}".format(type(ex).__name__, ex)
+    return MatchResult(remote_match_id, records, time.time() - start, error)
+
+
+def _init_worker(config):
+    global _marcotti
+    from marcottievents.base import Marcotti
+    _marcotti = Marcotti(config)
+
+
+def _load_worker(args):
+    session = Session(_marcotti.connection)
+    try:
+        return load_match(session, *args)
+    finally:
+        session.close()
+
+
+class ParallelETL(object):
+    """
+    Load event data feeds of many matches in parallel worker processes.
+
+    Records are partitioned by remote match ID, and each match is transformed, loaded and committed
+    in a worker process that holds its own database engine and session.  Match, player and team
+    mappings must already be loaded.
+    """
+
+    def __init__(self, config, **kwargs):
+        self.config = config
+        self.supplier = kwargs.get('supplier')
+        self.transformer = kwargs.get('transform', MarcottiEventTransform)
+        self.loader = kwargs.get('load', MarcottiLoad)
+        self.processes = kwargs.get('processes')
+
+    def workflow(self, *feeds):
+        """
+        Load per-match data in parallel and report timings and failures for each match.
+
+        :param feeds: (entity, records) tuples, e.g. ('events', events), ('actions', actions).  Entities
+                      are loaded in this order within each match.
+        :return: List of :class:`MatchResult` tuples, in order of completion.
+        """
+        matches = OrderedDict()
+        for entity, records in feeds:
+            for remote_match_id, match_records in partition(records).items():
+                matches.setdefault(remote_match_id, []).append((entity, match_records))
+        tasks = [(self.transformer, self.loader, self.supplier, remote_match_id, match_feeds)
+                 for remote_match_id, match_feeds in matches.items()]
+        logger.info("Loading {} matches".format(len(tasks)))
+
+        start = time.time()
+        results = []
+        pool = Pool(self.processes, initializer=_init_worker, initargs=(self.config,))
+        try:
+            for result in pool.imap_unordered(_load_worker, tasks):
+                if result.error:
+                    logger.error("Match {0.remote_match_id}: failed after {0.seconds:.2f} s ({0.error})".format(result))
+                else:
+                    logger.info("Match {0.remote_match_id}: {0.records} records in {0.seconds:.2f} s".format(result))
+                results.append(result)
+        finally:
+            pool.close()
+            pool.join()
+        failures = [result for result in results if result.error]
+        logger.info("{} matches loaded, {} failed, in {:.1f} s".format(
+            len(results) - len(failures), len(failures), time.time() - start))
+        return results
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import pandas as pd
 
 from marcottievents.models.common.enums import (ConfederationType, ActionType, ModifierType,
@@ -6,7 +8,7 @@ from marcottievents.models.common.enums import (ConfederationType, ActionType, M
 from marcottievents.models.common.suppliers import (MatchEventMap, MatchMap, CompetitionMap,
                                                     VenueMap, PositionMap, PlayerMap, ManagerMap,
                                                     RefereeMap)
-from marcottievents.models.common.overview import Countries, Timezones, Competitions, Seasons, Venues, Surfaces
+from marcottievents.models.common.overview import Countries, Timezones, Competitions, Venues, Surfaces
 from marcottievents.models.common.personnel import Players, Managers, Referees
 from marcottievents.models.club import Clubs, ClubLeagueMatches, ClubMap
 from .workflows import WorkflowBase
@@ -132,13 +134,13 @@ class MarcottiTransform(WorkflowBase):
     def league_matches(self, data_frame):
         lambdafunc = lambda x: pd.Series([
             self.get_id(Competitions, name=x['competition']),
-            self.get_id(Seasons, name=x['season']),
+            self.get_season_id(x['season']),
             self.get_id(Venues, name=x['venue']),
             self.get_id(Clubs, name=x['home_team']),
             self.get_id(Clubs, name=x['away_team']),
-            self.get_id(Managers, full_name=x['home_manager']),
-            self.get_id(Managers, full_name=x['away_manager']),
-            self.get_id(Referees, full_name=x['referee'])
+            self.get_id(Managers, stored_full_name=x['home_manager']),
+            self.get_id(Managers, stored_full_name=x['away_manager']),
+            self.get_id(Referees, stored_full_name=x['referee'])
         ])
         ids_frame = data_frame.apply(lambdafunc, axis=1)
         ids_frame.columns = ['competition_id', 'season_id', 'venue_id', 'home_team_id', 'away_team_id',
@@ -149,12 +151,12 @@ class MarcottiTransform(WorkflowBase):
         lambdafunc = lambda x: pd.Series([
             self.get_id(ClubLeagueMatches,
                         competition_id=self.get_id(Competitions, name=x['competition']),
-                        season_id=self.get_id(Seasons, name=x['season']),
+                        season_id=self.get_season_id(x['season']),
                         matchday=x['matchday'],
                         home_team_id=self.get_id(Clubs, name=x['home_team']),
                         away_team_id=self.get_id(Clubs, name=x['away_team'])),
             self.get_id(Clubs, name=x['player_team']),
-            self.get_id(Players, full_name=x['player_name'])
+            self.get_id(Players, stored_full_name=x['player_name'])
         ])
         ids_frame = data_frame.apply(lambdafunc, axis=1)
         ids_frame.columns = ['match_id', 'team_id', 'player_id']
@@ -172,82 +174,127 @@ class MarcottiTransform(WorkflowBase):
 
 
 class MarcottiEventTransform(MarcottiTransform):
+    """
+    Transform and validate extracted event data, resolving supplier IDs through the mapper tables.
+    """
+
+    #: Query predicates of lookups made during transformation, as (data model, column names) tuples.
+    LOOKUP_PREDICATES = [(model, ('supplier_id', 'remote_id')) for model in
+                         (CompetitionMap, VenueMap, ClubMap, ManagerMap, RefereeMap,
+                          MatchMap, PlayerMap, PositionMap, MatchEventMap)]
+
+    #: Maximum number of remote IDs in the IN clause of a mapper query.
+    REMOTE_ID_BATCH = 500
+
+    def remote_ids(self, model, values):
+        """
+        Retrieve the supplier's remote-to-local ID mapping of a data model for a set of remote IDs.
+
+        IDs are read from the ID cache, and remote IDs that are not cached are retrieved with a few
+        mapper queries and added to the cache.  Remote IDs that map to more than one record are
+        excluded, as in :meth:`get_id`.
+
+        :param model: Mapper data model.
+        :param values: Series of remote IDs.
+        :return: Dictionary of local record IDs keyed by remote ID.
+        """
+        mapping, missing = {}, []
+        for value in values.dropna().unique():
+            record_id = self.id_cache.lookup(model, dict(remote_id=value, supplier_id=self.supplier_id))
+            if record_id is None:
+                missing.append(value)
+            else:
+                mapping[value] = record_id
+        for indx in range(0, len(missing), self.REMOTE_ID_BATCH):
+            batch = missing[indx:indx + self.REMOTE_ID_BATCH]
+            cached = self.id_cache.prefetch(self.session, model, ('remote_id',), model.remote_id.in_(batch),
+                                            supplier_id=self.supplier_id)
+            mapping.update((remote_id, record_id) for (remote_id,), record_id in cached.items())
+        return mapping
+
+    def map_remote_ids(self, series, model):
+        """
+        Map a Series of remote IDs to local record IDs through a mapper data model.
+
+        :param series: Series of remote IDs.
+        :param model: Mapper data model.
+        :return: Series of local record IDs, with None in place of unmapped IDs.
+        """
+        return self.map_ids(series, self.remote_ids(model, series))
+
+    @staticmethod
+    def map_ids(series, mapping):
+        """
+        Map every value of a Series in one operation.  Values with no mapping become None.
+
+        :param series: Series of remote IDs, names or codes.
+        :param mapping: Series or dictionary keyed by the values of `series`.
+        :return: Series of mapped values, with None in place of missing values.
+        """
+        mapped = series.map(mapping).astype(object)
+        return mapped.where(pd.notnull(mapped), None)
+
+    def map_unique(self, series, func):
+        """
+        Apply a function once per distinct value of a Series and map the results to all values.
+
+        :param series: Series of values.
+        :param func: Function applied to each distinct value.
+        :return: Series of function results, with None in place of missing results.
+        """
+        return self.map_ids(series, {value: func(value) for value in series.unique()})
+
+    def match_ids(self, data_frame):
+        return pd.DataFrame(OrderedDict([
+            ('competition_id', self.map_remote_ids(data_frame['remote_competition_id'], CompetitionMap)),
+            ('season_id', self.map_unique(data_frame['season_name'], self.get_season_id)),
+            ('venue_id', self.map_remote_ids(data_frame['remote_venue_id'], VenueMap)),
+            ('home_team_id', self.map_remote_ids(data_frame['remote_home_team_id'], ClubMap)),
+            ('away_team_id', self.map_remote_ids(data_frame['remote_away_team_id'], ClubMap)),
+            ('home_manager_id', self.map_remote_ids(data_frame['remote_home_manager_id'], ManagerMap)),
+            ('away_manager_id', self.map_remote_ids(data_frame['remote_away_manager_id'], ManagerMap)),
+            ('referee_id', self.map_remote_ids(data_frame['remote_referee_id'], RefereeMap))
+        ]), index=data_frame.index)
 
     def league_matches(self, data_frame):
-        lambdafunc = lambda x: pd.Series([
-            self.get_id(CompetitionMap, remote_id=x['remote_competition_id'], supplier_id=self.supplier_id),
-            self.get_id(Seasons, name=x['season_name']),
-            self.get_id(VenueMap, remote_id=x['remote_venue_id'], supplier_id=self.supplier_id),
-            self.get_id(ClubMap, remote_id=x['remote_home_team_id'], supplier_id=self.supplier_id),
-            self.get_id(ClubMap, remote_id=x['remote_away_team_id'], supplier_id=self.supplier_id),
-            self.get_id(ManagerMap, remote_id=x['remote_home_manager_id'], supplier_id=self.supplier_id),
-            self.get_id(ManagerMap, remote_id=x['remote_away_manager_id'], supplier_id=self.supplier_id),
-            self.get_id(RefereeMap, remote_id=x['remote_referee_id'], supplier_id=self.supplier_id),
-            self.make_date_object(x['date'])
-        ])
-        ids_frame = data_frame.apply(lambdafunc, axis=1)
-        ids_frame.columns = ['competition_id', 'season_id', 'venue_id', 'home_team_id', 'away_team_id',
-                             'home_manager_id', 'away_manager_id', 'referee_id', 'match_date']
+        ids_frame = self.match_ids(data_frame)
+        ids_frame['match_date'] = self.map_unique(data_frame['date'], self.make_date_object)
         joined_frame = data_frame.join(ids_frame).drop(['season_name', 'date'], axis=1)
         return joined_frame
 
     def knockout_matches(self, data_frame):
-        lambdafunc = lambda x: pd.Series([
-            self.get_id(CompetitionMap, remote_id=x['remote_competition_id'], supplier_id=self.supplier_id),
-            self.get_id(Seasons, name=x['season_name']),
-            self.get_id(VenueMap, remote_id=x['remote_venue_id'], supplier_id=self.supplier_id),
-            self.get_id(ClubMap, remote_id=x['remote_home_team_id'], supplier_id=self.supplier_id),
-            self.get_id(ClubMap, remote_id=x['remote_away_team_id'], supplier_id=self.supplier_id),
-            self.get_id(ManagerMap, remote_id=x['remote_home_manager_id'], supplier_id=self.supplier_id),
-            self.get_id(ManagerMap, remote_id=x['remote_away_manager_id'], supplier_id=self.supplier_id),
-            self.get_id(RefereeMap, remote_id=x['remote_referee_id'], supplier_id=self.supplier_id),
-            KnockoutRoundType.from_string(x['round']),
-            self.make_date_object(x['date'])
-        ])
-        ids_frame = data_frame.apply(lambdafunc, axis=1)
-        ids_frame.columns = ['competition_id', 'season_id', 'venue_id', 'home_team_id', 'away_team_id',
-                             'home_manager_id', 'away_manager_id', 'referee_id', 'ko_round', 'match_date']
+        ids_frame = self.match_ids(data_frame)
+        ids_frame['ko_round'] = self.map_unique(data_frame['round'], KnockoutRoundType.from_string)
+        ids_frame['match_date'] = self.map_unique(data_frame['date'], self.make_date_object)
         joined_frame = data_frame.join(ids_frame).drop(['season_name', 'date', 'round'], axis=1)
         return joined_frame
 
     def match_lineups(self, data_frame):
-        lambdafunc = lambda x: pd.Series([
-            self.get_id(MatchMap, remote_id=x['remote_match_id'], supplier_id=self.supplier_id),
-            self.get_id(PlayerMap, remote_id=x['remote_player_id'], supplier_id=self.supplier_id),
-            self.get_id(ClubMap, remote_id=x['remote_team_id'], supplier_id=self.supplier_id),
-            self.get_id(PositionMap, remote_id=x['remote_position_id'], supplier_id=self.supplier_id)
-        ])
-        ids_frame = data_frame.apply(lambdafunc, axis=1)
-        ids_frame.columns = ['match_id', 'player_id', 'team_id', 'position_id']
+        ids_frame = pd.DataFrame(OrderedDict([
+            ('match_id', self.map_remote_ids(data_frame['remote_match_id'], MatchMap)),
+            ('player_id', self.map_remote_ids(data_frame['remote_player_id'], PlayerMap)),
+            ('team_id', self.map_remote_ids(data_frame['remote_team_id'], ClubMap)),
+            ('position_id', self.map_remote_ids(data_frame['remote_position_id'], PositionMap))
+        ]), index=data_frame.index)
         return data_frame.join(ids_frame).drop(['remote_match_id', 'remote_player_id',
                                                 'remote_team_id', 'remote_position_id'], axis=1)
 
     def events(self, data_frame):
-        lambdafunc = lambda x: pd.Series([
-            self.get_id(MatchMap, remote_id=x['remote_match_id'], supplier_id=self.supplier_id),
-            self.get_id(ClubMap, remote_id=x['remote_team_id'], supplier_id=self.supplier_id)
-        ])
-        ids_frame = data_frame.apply(lambdafunc, axis=1)
-        ids_frame.columns = ['match_id', 'team_id']
+        ids_frame = pd.DataFrame(OrderedDict([
+            ('match_id', self.map_remote_ids(data_frame['remote_match_id'], MatchMap)),
+            ('team_id', self.map_remote_ids(data_frame['remote_team_id'], ClubMap))
+        ]), index=data_frame.index)
         joined_frame = data_frame.join(ids_frame).drop(['remote_match_id', 'remote_team_id'], axis=1)
         new_frame = joined_frame.where((pd.notnull(joined_frame)), None)
         return new_frame
 
     def actions(self, data_frame):
-        match_event_dict = {rec.remote_id: rec.id for rec in
-                            self.session.query(MatchEventMap).filter_by(supplier_id=self.supplier_id)}
-        match_map_dict = {rec.remote_id: rec.id for rec in
-                          self.session.query(MatchMap).filter_by(supplier_id=self.supplier_id)}
-        player_map_dict = {rec.remote_id: rec.id for rec in
-                           self.session.query(PlayerMap).filter_by(supplier_id=self.supplier_id)}
-        lambdafunc = lambda x: pd.Series([
-            match_event_dict.get(x['remote_event_id'], None),
-            match_map_dict.get(x['remote_match_id'], None),
-            player_map_dict.get(x['remote_player_id'], None),
-            ActionType.from_string(x['action_type']),
-        ])
-        ids_frame = data_frame.apply(lambdafunc, axis=1)
-        ids_frame.columns = ['event_id', 'match_id', 'player_id', 'type']
+        ids_frame = pd.DataFrame(OrderedDict([
+            ('event_id', self.map_remote_ids(data_frame['remote_event_id'], MatchEventMap)),
+            ('match_id', self.map_remote_ids(data_frame['remote_match_id'], MatchMap)),
+            ('player_id', self.map_remote_ids(data_frame['remote_player_id'], PlayerMap)),
+            ('type', self.map_unique(data_frame['action_type'], ActionType.from_string))
+        ]), index=data_frame.index)
         joined_frame = data_frame.join(ids_frame).drop(['remote_event_id', 'remote_match_id',
                                                         'remote_player_id', 'action_type'], axis=1)
         new_frame = joined_frame.where((pd.notnull(joined_frame)), None)
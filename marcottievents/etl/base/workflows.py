@@ -1,9 +1,20 @@
+import logging
+import weakref
 from datetime import date
+from itertools import islice
+from collections import OrderedDict
 
 import pandas as pd
+from sqlalchemy import event
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.session import Session
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 
 from marcottievents.models.common.suppliers import Suppliers
+from marcottievents.models.common.overview import Seasons, Years
+
+
+logger = logging.getLogger(__name__)
 
 
 class ETL(object):
@@ -15,10 +26,11 @@ class ETL(object):
 
     def __init__(self, **kwargs):
         self.supplier = kwargs.get('supplier')
-        self.transformer = kwargs.get('transform')(kwargs.get('session'), self.supplier)
-        self.loader = kwargs.get('load')(kwargs.get('session'), self.supplier)
+        self.session = kwargs.get('session')
+        self.transformer = kwargs.get('transform')(self.session, self.supplier)
+        self.loader = kwargs.get('load')(self.session, self.supplier)
 
-    def workflow(self, entity, *data):
+    def workflow(self, entity, *data, **kwargs):
         """
         Implement ETL workflow for a specific data entity:
 
@@ -26,9 +38,29 @@ class ETL(object):
         2. Transform and validate combined data into IDs and enums in the Marcotti database.
         3. Load transformed data into the database if it is not already there.
 
+        If `chunksize` is given, records of the primary data source are consumed that many at a time,
+        and each chunk is combined, transformed, loaded and committed before the next one is read.
+        With a streaming extractor that yields its records, memory use is then bounded by the chunk
+        size instead of the size of the feed.  Supplemental data sources are read in full.
+
         :param entity: Data model name
-        :param data: Data payloads from XML and/or CSV sources, in lists of dictionaries
+        :param data: Data payloads from XML and/or CSV sources, in lists or iterables of dictionaries
+        :param chunksize: Number of primary records per chunk (optional).
         """
+        chunksize = kwargs.get('chunksize')
+        if chunksize:
+            primary = iter(data[0])
+            supplemental = [list(payload) for payload in data[1:]]
+            for indx, chunk in enumerate(iter(lambda: list(islice(primary, chunksize)), [])):
+                logger.info("{}: chunk {} ({} records)".format(entity.capitalize(), indx + 1, len(chunk)))
+                self.load_chunk(entity, chunk, *supplemental)
+                self.session.commit()
+        else:
+            self.load_chunk(entity, *data)
+        logger.info("{} ID lookups: {hits} cache hits, {misses} misses, {evictions} evictions".format(
+            entity.capitalize(), **self.transformer.id_cache.stats()))
+
+    def load_chunk(self, entity, *data):
         getattr(self.loader, entity)(getattr(self.transformer, entity)(self.combiner(*data)))
 
     @staticmethod
@@ -41,20 +73,142 @@ class ETL(object):
         :param data_dicts: List of data payloads from data sources, primary source first in list.
         :return: DataFrame of combined data.
         """
-        data_frames = [pd.DataFrame(data) for data in data_dicts]
+        data_frames = [pd.DataFrame(list(data)) for data in data_dicts]
         if len(data_frames) > 1:
             new_frames = [data_frame.dropna(axis=1, how='all') for data_frame in data_frames]
             return pd.merge(*new_frames, on=['remote_id'])
         return data_frames[0]
 
 
+class LookupCache(object):
+    """
+    Least-recently-used cache of record IDs, keyed by data model and query conditions.
+
+    Only successful lookups are cached, so records that are loaded after a failed lookup are found
+    on the next request.  Hit, miss and eviction counts are kept to measure the database round trips
+    that the cache has saved.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model, conditions):
+        return model, frozenset(conditions.items())
+
+    def lookup(self, model, conditions):
+        """
+        Retrieve cached record ID and mark it as most recently used.
+
+        :param model: Marcotti data model.
+        :param conditions: Dictionary of query conditions.
+        :return: Record ID, or None if not in cache.
+        """
+        key = self.key(model, conditions)
+        try:
+            record_id = self._ids.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        except TypeError:
+            return None
+        self._ids[key] = record_id
+        self.hits += 1
+        return record_id
+
+    def store(self, model, conditions, record_id):
+        """
+        Save record ID to cache, evicting least recently used IDs if cache is full.
+
+        :param model: Marcotti data model.
+        :param conditions: Dictionary of query conditions.
+        :param record_id: Record ID.
+        """
+        try:
+            key = self.key(model, conditions)
+            self._ids.pop(key, None)
+        except TypeError:
+            return
+        self._ids[key] = record_id
+        while self.maxsize is not None and len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+            self.evictions += 1
+
+    def prefetch(self, session, model, fields, *criteria, **filters):
+        """
+        Warm cache with the IDs of all records of a data model that satisfy a set of filters.
+
+        The records are retrieved in one query, and each ID is keyed by the filters plus the values of
+        `fields`.  Keys that match more than one record are not cached.
+
+        :param session: Database session.
+        :param model: Marcotti data model.
+        :param fields: Sequence of model fields used as lookup conditions.
+        :param criteria: Additional filter criteria, e.g. to restrict the query to some field values.
+        :param filters: Query conditions common to all records.
+        :return: Dictionary of cached IDs, keyed by tuples of the values of `fields`.
+        """
+        record_ids = {}
+        for record in session.query(model).filter_by(**filters).filter(*criteria):
+            values = tuple(getattr(record, field) for field in fields)
+            record_ids[values] = None if values in record_ids else record.id
+        cached = {values: record_id for values, record_id in record_ids.items() if record_id is not None}
+        for values, record_id in cached.items():
+            self.store(model, dict(filters, **dict(zip(fields, values))), record_id)
+        return cached
+
+    def clear(self):
+        self._ids.clear()
+
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions, size=len(self._ids))
+
+
 class WorkflowBase(object):
+    """
+    Base class of transformation and loading workflows.
+
+    Record IDs and season labels are cached per database engine and shared by the workflows of a
+    process.  The caches of an engine are emptied whenever a session or connection rolls back a
+    transaction or savepoint, as cached IDs may refer to records that no longer exist.
+    """
+    CACHE_SIZE = 100000
+    caches = weakref.WeakKeyDictionary()
 
     def __init__(self, session, supplier):
         self.session = session
+        bind = session.get_bind()
+        if bind.engine not in self.caches:
+            self.caches[bind.engine] = (LookupCache(maxsize=self.CACHE_SIZE), {})
+        self.id_cache, self.season_labels = self.caches[bind.engine]
+        for target, name in [(session, 'after_rollback'), (bind, 'rollback'), (bind, 'rollback_savepoint')]:
+            if not event.contains(target, name, WorkflowBase.clear_cache):
+                event.listen(target, name, WorkflowBase.clear_cache)
         self.supplier_id = self.get_id(Suppliers, name=supplier) if supplier else None
 
+    @classmethod
+    def clear_cache(cls, source=None, *args):
+        """
+        Empty ID cache and season labels of the engine of a session or connection, or of all engines.
+
+        :param source: Session or database connection, or None for all engines.
+        """
+        if source is None:
+            engines = list(cls.caches.keys())
+        else:
+            engines = [(source.get_bind() if isinstance(source, Session) else source).engine]
+        for engine in engines:
+            for cache in cls.caches.get(engine, ()):
+                cache.clear()
+
     def get_id(self, model, **conditions):
+        record_id = self.id_cache.lookup(model, conditions)
+        if record_id is not None:
+            return record_id
         try:
             record_id = self.session.query(model).filter_by(**conditions).one().id
         except NoResultFound as ex:
@@ -63,8 +217,53 @@ class WorkflowBase(object):
         except MultipleResultsFound as ex:
             print "{} has multiple records in Marcotti database for: {}".format(model.__name__, conditions)
             return None
+        self.id_cache.store(model, conditions, record_id)
         return record_id
 
+    def load_seasons(self):
+        """
+        Load dictionary of season labels and IDs of the database with one query, so that season names
+        are resolved without evaluating the `Seasons.name` expression.
+
+        :return: Number of seasons loaded.
+        """
+        start_year, end_year = aliased(Years), aliased(Years)
+        query = self.session.query(Seasons.id, start_year.yr, end_year.yr).\
+            join(start_year, Seasons.start_year_id == start_year.id).\
+            join(end_year, Seasons.end_year_id == end_year.id)
+        self.season_labels.clear()
+        for season_id, start_yr, end_yr in query:
+            label = u"{}".format(start_yr) if start_yr == end_yr else u"{}-{}".format(start_yr, end_yr)
+            self.season_labels[label] = season_id
+        return len(self.season_labels)
+
+    def get_season_id(self, name):
+        """
+        Retrieve ID of season from its name.  Season labels are reloaded once if the name is not found,
+        and names that are still not found are remembered until the labels are reloaded again.
+
+        :param name: Season name, of form YYYY or YYYY-YYYY.
+        :return: Season ID, or None if the season does not exist.
+        """
+        label = u"{}".format(name)
+        if label not in self.season_labels:
+            self.load_seasons()
+            self.season_labels.setdefault(label, None)
+        if self.season_labels[label] is None:
+            print "{} has no records in Marcotti database for: {}".format(Seasons.__name__, dict(name=name))
+        return self.season_labels[label]
+
+    def prefetch(self, model, *fields, **filters):
+        """
+        Warm ID cache for lookups of a data model on `fields`, restricted to records that satisfy `filters`.
+
+        :param model: Marcotti data model.
+        :param fields: Model fields used as lookup conditions.
+        :param filters: Query conditions common to all lookups, e.g. supplier ID.
+        :return: Dictionary of cached IDs, keyed by tuples of the values of `fields`.
+        """
+        return self.id_cache.prefetch(self.session, model, fields, **filters)
+
     @staticmethod
     def make_date_object(iso_date):
         """
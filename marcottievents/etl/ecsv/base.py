@@ -9,23 +9,28 @@ logger = logging.getLogger(__name__)
 
 def extract(func):
     """
-    Decorator function. Open and extract data from CSV files.  Return list of dictionaries.
+    Decorator function. Open and extract data from CSV files.  Return list of dictionaries, or
+    a generator of dictionaries if the extractor is streaming.
 
     :param func: Wrapped function with *args and **kwargs arguments.
     """
-    def _wrapper(*args):
-        out = []
-        instance, prefix = args
+    def _records(instance, prefix):
         for fname in glob.glob(os.path.join(getattr(instance, 'directory'), *prefix)):
             with open(fname) as g:
-                out.extend(func(instance, data=csv.DictReader(g)))
-        return out
+                for record in func(instance, data=csv.DictReader(g)):
+                    yield record
+
+    def _wrapper(*args):
+        instance, prefix = args
+        records = _records(instance, prefix)
+        return records if getattr(instance, 'streaming', False) else list(records)
     return _wrapper
 
 
 class BaseCSV(object):
-    def __init__(self, directory):
+    def __init__(self, directory, streaming=False):
         self.directory = directory
+        self.streaming = streaming
 
     @staticmethod
     def column(field, **kwargs):
@@ -5,7 +5,7 @@ class CSVExtractor(BaseCSV):
 
     @extract
     def suppliers(self, *args, **kwargs):
-        return [dict(name=self.column_unicode("Name", **keys)) for keys in kwargs.get('data')]
+        return (dict(name=self.column_unicode("Name", **keys)) for keys in kwargs.get('data'))
 
     @staticmethod
     def years(start_yr, end_yr):
@@ -19,24 +19,24 @@ class CSVExtractor(BaseCSV):
 
     @extract
     def countries(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      name=self.column_unicode("Name", **keys),
                      code=self.column("Code", **keys),
                      confed=self.column("Confederation", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def competitions(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      name=self.column_unicode("Name", **keys),
                      level=self.column_int("Level", **keys),
                      country=self.column_unicode("Country", **keys),
                      confed=self.column("Confederation", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def venues(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      name=self.column_unicode("Venue Name", **keys),
                      city=self.column_unicode("City", **keys),
                      region=self.column_unicode("Region", **keys),
@@ -51,32 +51,32 @@ class CSVExtractor(BaseCSV):
                      width=self.column_int("Width", **keys),
                      capacity=self.column_int("Capacity", **keys),
                      seats=self.column_int("Seats", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def surfaces(self, *args, **kwargs):
-        return [dict(description=self.column_unicode("Description", **keys),
+        return (dict(description=self.column_unicode("Description", **keys),
                      surface_type=self.column("Type", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def timezones(self, *args, **kwargs):
-        return [dict(name=self.column_unicode("Name", **keys),
+        return (dict(name=self.column_unicode("Name", **keys),
                      confed=self.column("Confederation", **keys),
                      offset=self.column_float("Offset", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def clubs(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      name=self.column_unicode("Name", **keys),
                      short_name=self.column_unicode("Short Name", **keys),
                      country=self.column_unicode("Country", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def managers(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      first_name=self.column_unicode("First Name", **keys),
                      known_first_name=self.column_unicode("Known First Name", **keys),
                      middle_name=self.column_unicode("Middle Name", **keys),
@@ -86,11 +86,11 @@ class CSVExtractor(BaseCSV):
                      name_order=self.column("Name Order", **keys),
                      dob=self.column("Birthdate", **keys),
                      country=self.column_unicode("Country", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def referees(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      first_name=self.column_unicode("First Name", **keys),
                      known_first_name=self.column_unicode("Known First Name", **keys),
                      middle_name=self.column_unicode("Middle Name", **keys),
@@ -100,11 +100,11 @@ class CSVExtractor(BaseCSV):
                      name_order=self.column("Name Order", **keys),
                      dob=self.column("Birthdate", **keys),
                      country=self.column_unicode("Country", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def players(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      first_name=self.column_unicode("First Name", **keys),
                      known_first_name=self.column_unicode("Known First Name", **keys),
                      middle_name=self.column_unicode("Middle Name", **keys),
@@ -115,18 +115,18 @@ class CSVExtractor(BaseCSV):
                      dob=self.column("Birthdate", **keys),
                      country=self.column_unicode("Country", **keys),
                      position_name=self.column_unicode("Position", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def positions(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      name=self.column_unicode("Position", **keys),
                      position_type=self.column("Type", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def league_matches(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      competition=self.column_unicode("Competition", **keys),
                      season=self.column("Season", **keys),
                      match_date=self.column("Match Date", **keys),
@@ -144,11 +144,11 @@ class CSVExtractor(BaseCSV):
                      kickoff_wx=self.column("KO Wx", **keys),
                      halftime_wx=self.column("HT Wx", **keys),
                      fulltime_wx=self.column("FT Wx", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def group_matches(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      competition=self.column_unicode("Competition", **keys),
                      season=self.column("Season", **keys),
                      match_date=self.column("Match Date", **keys),
@@ -168,11 +168,11 @@ class CSVExtractor(BaseCSV):
                      kickoff_wx=self.column("KO Wx", **keys),
                      halftime_wx=self.column("HT Wx", **keys),
                      fulltime_wx=self.column("FT Wx", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def knockout_matches(self, *args, **kwargs):
-        return [dict(remote_id=self.column("ID", **keys),
+        return (dict(remote_id=self.column("ID", **keys),
                      competition=self.column_unicode("Competition", **keys),
                      season=self.column("Season", **keys),
                      match_date=self.column("Match Date", **keys),
@@ -192,11 +192,11 @@ class CSVExtractor(BaseCSV):
                      halftime_wx=self.column("HT Wx", **keys),
                      fulltime_wx=self.column("FT Wx", **keys),
                      extra_time=self.column_bool("Extra Time", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def match_lineups(self, *args, **kwargs):
-        return [dict(competition=self.column_unicode("Competition", **keys),
+        return (dict(competition=self.column_unicode("Competition", **keys),
                      season=self.column("Season", **keys),
                      matchday=self.column_int("Matchday", **keys),
                      home_team=self.column_unicode("Home Team", **keys),
@@ -205,10 +205,10 @@ class CSVExtractor(BaseCSV):
                      player_name=self.column_unicode("Player", **keys),
                      starter=self.column_bool("Starting", **keys),
                      captain=self.column_bool("Captain", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
 
     @extract
     def modifiers(self, *args, **kwargs):
-        return [dict(modifier=self.column("Modifier", **keys),
+        return (dict(modifier=self.column("Modifier", **keys),
                      modifier_category=self.column("Category", **keys))
-                for keys in kwargs.get('data')]
+                for keys in kwargs.get('data'))
@@ -0,0 +1,149 @@
+import os
+import time
+import logging
+from collections import namedtuple
+from multiprocessing import Pool
+
+import pandas as pd
+from sqlalchemy.orm.session import Session
+
+from .match import MatchAnalytics
+
+
+logger = logging.getLogger(__name__)
+
+
+MatchAnalysis = namedtuple('MatchAnalysis', ['match_id', 'frame', 'seconds', 'error'])
+
+_marcotti = None
+
+
+def checkpoint_path(checkpoint, function, match_id):
+    name = function.__name__ if callable(function) else function
+    return os.path.join(checkpoint, '{}_{}.pkl'.format(name, match_id))
+
+
+def analyze_match(analytics, function, match_id, checkpoint=None):
+    """
+    Run an analytics function on one match.  Failures are reported and not checkpointed.
+
+    :param analytics: Analytics object.
+    :param function: Name of an analytics method that accepts a list of match IDs, or function of
+                     (analytics, match ID).  Either returns a DataFrame.
+    :param match_id: Match ID.
+    :param checkpoint: Directory of checkpoint files, or None.
+    :return: :class:`MatchAnalysis` tuple.
+    """
+    start = time.time()
+    try:
+        if callable(function):
+            frame = function(analytics, match_id)
+        else:
+            frame = getattr(analytics, function)([match_id])
+        if checkpoint:
+            path = checkpoint_path(checkpoint, function, match_id)
+            frame.to_pickle(path + '.tmp')
+            os.rename(path + '.tmp', path)
+        error = None
+    except Exception as ex:
+        logger.exception("Match {} not analyzed".format(match_id))
+        frame, error = None, "{}: {}".format(type(ex).__name__, ex)
+    return MatchAnalysis(match_id, frame, time.time() - start, error)
+
+
+def _init_worker(config):
+    global _marcotti
+    from marcottievents.base import Marcotti
+    _marcotti = Marcotti(config)
+
+
+def _analyze_worker(args):
+    analytics_class, function, match_id, checkpoint = args
+    session = Session(_marcotti.connection)
+    try:
+        return analyze_match(analytics_class(session), function, match_id, checkpoint)
+    finally:
+        session.close()
+
+
+class ParallelAnalytics(object):
+    """
+    Run match analytics over many matches in parallel worker processes.
+
+    Each match is analyzed in a worker process that holds its own database engine and session, and
+    the results are concatenated into one DataFrame.  If a checkpoint directory is given, the result
+    of each match is saved there as it completes, and matches with saved results are not analyzed
+    again, so that an interrupted run can be resumed.  Checkpoint files are named after the analytics
+    function and the match, so that runs of different functions can share a directory.
+    """
+
+    def __init__(self, config, function, **kwargs):
+        self.config = config
+        self.function = function
+        self.analytics = kwargs.get('analytics', MatchAnalytics)
+        if not callable(function) and not hasattr(self.analytics, function):
+            raise ValueError("{} has no analytics method {}".format(self.analytics.__name__, function))
+        self.processes = kwargs.get('processes')
+        self.checkpoint = kwargs.get('checkpoint')
+        self.results = []
+        self.throughput = None
+
+    def workflow(self, match_ids):
+        """
+        Analyze matches in parallel and report timings, failures and throughput.
+
+        :param match_ids: List of match IDs.
+        :return: DataFrame of the results of all analyzed matches, in order of match IDs.
+        """
+        frames = {}
+        if self.checkpoint:
+            if not os.path.exists(self.checkpoint):
+                os.makedirs(self.checkpoint)
+            for match_id in match_ids:
+                path = checkpoint_path(self.checkpoint, self.function, match_id)
+                if os.path.exists(path):
+                    frames[match_id] = pd.read_pickle(path)
+        tasks = [(self.analytics, self.function, match_id, self.checkpoint)
+                 for match_id in match_ids if match_id not in frames]
+        logger.info("Analyzing {} matches ({} checkpointed)".format(len(tasks), len(frames)))
+
+        start = time.time()
+        self.results = []
+        if tasks:
+            pool = Pool(self.processes, initializer=_init_worker, initargs=(self.config,))
+            try:
+                for result in pool.imap_unordered(_analyze_worker, tasks):
+                    if result.error:
+                        logger.error("Match {0.match_id}: failed after {0.seconds:.2f} s ({0.error})".format(result))
+                    else:
+                        logger.info("Match {0.match_id}: analyzed in {0.seconds:.2f} s".format(result))
+                        frames[result.match_id] = result.frame
+                    self.results.append(result)
+            finally:
+                pool.close()
+                pool.join()
+        seconds = time.time() - start
+        failures = [result for result in self.results if result.error]
+        self.throughput = len(self.results) / seconds if self.results else 0.0
+        logger.info("{} matches analyzed, {} failed, in {:.1f} s ({:.2f} matches/sec)".format(
+            len(self.results) - len(failures), len(failures), seconds, self.throughput))
+        completed = [frames[match_id] for match_id in match_ids if match_id in frames]
+        return pd.concat(completed) if completed else pd.DataFrame()
+
+    def season(self, competition_id, season_id):
+        """
+        Analyze all matches of a competition in a season.
+
+        :param competition_id: Competition ID.
+        :param season_id: Season ID.
+        :return: DataFrame of the results of all analyzed matches.
+        """
+        from marcottievents.base import Marcotti
+        marcotti = Marcotti(self.config)
+        try:
+            match_ids = [record[0] for record in marcotti.connection.execute(
+                MatchAnalytics.season_matches(competition_id, season_id))]
+        finally:
+            marcotti.connection.close()
+            marcotti.engine.dispose()
+        return self.workflow(match_ids)
@@ -0,0 +1,97 @@
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, subqueryload, with_polymorphic
+
+
+LOADER_PROFILES = {
+    'match_card': [
+        ('competition',), ('season', 'start_year'), ('season', 'end_year'), ('venue',), ('referee',),
+        ('home_manager',), ('away_manager',), ('home_team',), ('away_team',)
+    ],
+    'lineup_sheet': [
+        ('home_team',), ('away_team',), ('lineups', 'player'), ('lineups', 'position'), ('lineups', 'team')
+    ],
+    'event_timeline': [
+        ('events', 'team'), ('events', 'actions', 'lineup', 'player'), ('events', 'actions', 'modifiers', 'modifier')
+    ]
+}
+
+
+def polymorphic_entity(model):
+    """
+    Entity that loads a model together with the tables of its joined-inheritance subclasses, so that
+    subclass columns of loaded objects are not fetched one object at a time.
+
+    :param model: Mapped class.
+    :return: Mapped class, or polymorphic entity if model has joined-inheritance subclasses.
+    """
+    mapper = inspect(model)
+    if any(sub.local_table is not mapper.local_table for sub in mapper.self_and_descendants):
+        return with_polymorphic(model, '*', flat=True)
+    return model
+
+
+def entity_attributes(entity, name):
+    """
+    Retrieve relationship attributes of an entity by name.  Attributes that are not on the entity
+    itself are retrieved from the subclasses of polymorphic entities that define them.
+
+    :param entity: Mapped class or polymorphic entity.
+    :param name: Relationship name.
+    :return: List of relationship attributes.
+    """
+    if hasattr(entity, name):
+        return [getattr(entity, name)]
+    info = inspect(entity)
+    if not info.is_aliased_class:
+        return []
+    return [getattr(getattr(entity, sub.class_.__name__), name) for sub in info.mapper.self_and_descendants
+            if name in sub.relationships]
+
+
+def profile_options(model, profile):
+    """
+    Loader options of a named loader profile for queries of a match model.
+
+    Related objects referenced by the profile's relationship paths are loaded with the query:
+    many-to-one relationships by a join, and collections by one extra query per collection.
+    Relationships that the model does not define are ignored.
+
+    :param model: Match model, or polymorphic match entity.
+    :param profile: Name of loader profile in ``LOADER_PROFILES``.
+    :return: List of loader options.
+    """
+    entities = {}
+    options = []
+
+    def extend(option, entity, path, names):
+        if not names:
+            options.append(option)
+            return
+        for attribute in entity_attributes(entity, names[0]):
+            prop = attribute.property
+            key = path + (prop,)
+            if key not in entities:
+                entities[key] = polymorphic_entity(prop.mapper.class_)
+            target = entities[key]
+            if target is not prop.mapper.class_:
+                attribute = attribute.of_type(target)
+            strategy = subqueryload if prop.uselist else joinedload
+            extend(strategy(attribute) if option is None else getattr(option, strategy.__name__)(attribute),
+                   target, key, names[1:])
+
+    for names in LOADER_PROFILES[profile]:
+        extend(None, model, (), names)
+    return options
+
+
+def profile_query(session, model, profile):
+    """
+    Query match records with the loader options of a named loader profile.
+
+    :param session: Database session.
+    :param model: Match model.
+    :param profile: Name of loader profile in ``LOADER_PROFILES``.
+    :return: Query object.
+    """
+    entity = polymorphic_entity(model)
+    return session.query(entity).options(*profile_options(entity, profile))
@@ -0,0 +1,170 @@
+import csv
+import uuid
+import logging
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class Sink(object):
+    """
+    Destination of the records produced by match data processors.
+
+    Records are namedtuples.  They are buffered and passed to :meth:`write_batch` in batches of
+    ``batch_size`` records, and remaining records are written when the sink is flushed or closed.
+    A sink may be shared by several processors; it is the caller's responsibility to close it.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, record):
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.write_batch(self.batch)
+            self.batch = []
+
+    def write_batch(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+
+class MemorySink(Sink):
+    """
+    Accumulate records in memory.  Records are appended as they are written, so the batch size
+    is ignored and flushing has no effect.
+    """
+
+    def __init__(self):
+        super(MemorySink, self).__init__()
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+class DataFrameSink(MemorySink):
+    """
+    Accumulate records in memory and build a DataFrame from them.
+
+    :param columns: Column names of an empty DataFrame, if no records are written.
+    """
+
+    def __init__(self, columns=None):
+        super(DataFrameSink, self).__init__()
+        self.columns = columns
+
+    def frame(self):
+        if not self.records:
+            return pd.DataFrame(columns=self.columns)
+        return pd.DataFrame.from_records(self.records, columns=self.records[0]._fields)
+
+
+class CSVSink(Sink):
+    """
+    Write records to a CSV file with a header row, through a file handle that stays open until the
+    sink is closed.
+
+    :param path: Path of CSV file.
+    :param batch_size: Number of records per write.
+    """
+
+    def __init__(self, path, batch_size=1000):
+        super(CSVSink, self).__init__(batch_size)
+        self.path = path
+        self.handle = open(path, 'wb')
+        self.writer = csv.writer(self.handle)
+        self.header = False
+
+    def write_batch(self, records):
+        if not self.header:
+            self.writer.writerow(records[0]._fields)
+            self.header = True
+        self.writer.writerows(records)
+
+    def close(self):
+        if not self.handle.closed:
+            super(CSVSink, self).close()
+            self.handle.close()
+            logger.info("Wrote records to {}".format(self.path))
+
+
+class ParquetSink(Sink):
+    """
+    Write records to a Parquet file, one row group per batch, through a file writer that stays open
+    until the sink is closed.  UUIDs are written as strings.
+
+    :param path: Path of Parquet file.
+    :param batch_size: Number of records per row group.
+    :param schema: Arrow schema of the records, or None to infer it from the first batch.
+    """
+
+    def __init__(self, path, batch_size=10000, schema=None):
+        if pa is None:
+            raise ImportError("pyarrow is required to write Parquet files")
+        super(ParquetSink, self).__init__(batch_size)
+        self.path = path
+        self.schema = schema
+        self.writer = None
+
+    def write_batch(self, records):
+        names = list(records[0]._fields)
+        columns = [[str(value) if isinstance(value, uuid.UUID) else value for value in values]
+                   for values in zip(*records)]
+        if self.schema is None:
+            table = pa.Table.from_arrays([pa.array(values) for values in columns], names)
+            self.schema = table.schema
+        else:
+            types = [self.schema.field(self.schema.get_field_index(name)).type for name in names]
+            table = pa.Table.from_arrays([pa.array(values, type=value_type)
+                                          for value_type, values in zip(types, columns)], schema=self.schema)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        super(ParquetSink, self).close()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            logger.info("Wrote records to {}".format(self.path))
+
+
+class TableSink(Sink):
+    """
+    Insert records into a database table whose columns are named after the record fields, with one
+    statement per batch.
+
+    :param connection: Database connection or session.
+    :param table: Table, or mapped class.
+    :param batch_size: Number of records per insert statement.
+    """
+
+    def __init__(self, connection, table, batch_size=1000):
+        super(TableSink, self).__init__(batch_size)
+        self.connection = connection
+        self.table = getattr(table, '__table__', table)
+
+    def write_batch(self, records):
+        self.connection.execute(self.table.insert(), [record._asdict() for record in records])
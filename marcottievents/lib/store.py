@@ -0,0 +1,193 @@
+import os
+import uuid
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import select, and_
+from sqlalchemy.sql.expression import label
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+import marcottievents.models.common.enums as enums
+import marcottievents.models.common.events as mce
+import marcottievents.models.common.match as mcm
+
+
+logger = logging.getLogger(__name__)
+
+
+ACTION_TYPES = sorted(enums.ActionType.values())
+MODIFIER_TYPES = sorted(enums.ModifierType.values())
+
+EVENT_STORE_FIELDS = OrderedDict([
+    ('action_id', 'uuid'),
+    ('event_id', 'uuid'),
+    ('match_id', 'uuid'),
+    ('team_id', 'uuid'),
+    ('lineup_id', 'uuid'),
+    ('period', 'int16'),
+    ('period_secs', 'int32'),
+    ('x', 'float32'),
+    ('y', 'float32'),
+    ('type', ACTION_TYPES),
+    ('x_end', 'float32'),
+    ('y_end', 'float32'),
+    ('z_end', 'float32'),
+    ('is_success', 'bool_'),
+    ('modifier', MODIFIER_TYPES)
+])
+
+
+def arrow_column(values, field_type):
+    """
+    Convert column values into an Arrow array.
+
+    UUIDs are stored as 16-byte fixed-size binary values, and enumerated types are dictionary-encoded
+    against all values of the enumeration, so that files share one dictionary.
+
+    :param values: List of column values.
+    :param field_type: Type name, or list of enumerated values.
+    :return: Arrow array.
+    """
+    if isinstance(field_type, list):
+        codes = {value: indx for indx, value in enumerate(field_type)}
+        indices = pa.array([None if value is None else codes[value] for value in values], type=pa.int16())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(field_type, type=pa.string()))
+    if field_type == 'uuid':
+        return pa.array([None if value is None else value.bytes for value in values], type=pa.binary(16))
+    return pa.array([None if pd.isnull(value) else value for value in values], type=getattr(pa, field_type)())
+
+
+def pandas_column(series, field_type):
+    """
+    Convert a column read from an Arrow table into the event store schema.
+
+    :param series: Series of column values.
+    :param field_type: Type name, or list of enumerated values.
+    :return: Series.
+    """
+    if isinstance(field_type, list):
+        return series.astype('category').cat.set_categories(field_type)
+    if field_type == 'uuid':
+        return series.map(lambda value: None if value is None else uuid.UUID(bytes=bytes(value)))
+    return series
+
+
+def read_events(path):
+    """
+    Read match event and action data from an event store file.
+
+    :param path: Path of Parquet file.
+    :return: DataFrame with one row per match action and modifier, with the columns of ``EVENT_STORE_FIELDS``.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required to read event store files")
+    data_frame = pq.read_table(path).to_pandas()
+    for field, field_type in EVENT_STORE_FIELDS.items():
+        data_frame[field] = pandas_column(data_frame[field], field_type)
+    return data_frame
+
+
+class EventStore(object):
+    """
+    Columnar store of match events and actions, exported from a Marcotti database to Parquet files.
+
+    Each row of an event store file holds a match action, the fields of its event, and one of the
+    action's modifiers; actions with several modifiers span several rows.  Action and modifier types
+    are dictionary-encoded, coordinates are single-precision floats, and IDs are 16-byte binary values.
+
+    Files are written to ``<directory>/matches/<match ID>.parquet`` and
+    ``<directory>/seasons/<competition ID>-<season ID>.parquet``.
+    """
+
+    def __init__(self, session, directory):
+        if pa is None:
+            raise ImportError("pyarrow is required for the event store")
+        self.session = session
+        self.directory = directory
+
+    def path(self, *parts):
+        return os.path.join(self.directory, *parts) + '.parquet'
+
+    def query(self, *criteria):
+        """
+        Query match actions joined to their events and modifiers.
+
+        :param criteria: Filter criteria on the event fields.
+        :return: Select statement.
+        """
+        fields = mce.event_fields().alias()
+        events = mce.MatchEvents.__table__
+        actions = mce.MatchActions.__table__
+        action_modifiers = mce.MatchActionModifiers.__table__
+        modifiers = mce.Modifiers.__table__
+        return select([
+            label('action_id', actions.c.id), label('event_id', fields.c.id), fields.c.match_id, fields.c.team_id,
+            actions.c.lineup_id, fields.c.period, fields.c.period_secs, events.c.x, events.c.y, actions.c.type,
+            actions.c.x_end, actions.c.y_end, actions.c.z_end, actions.c.is_success,
+            label('modifier', modifiers.c.type)
+        ]).select_from(
+            actions.join(fields, actions.c.event_id == fields.c.id).
+            join(events, events.c.id == fields.c.id).
+            outerjoin(action_modifiers, action_modifiers.c.action_id == actions.c.id).
+            outerjoin(modifiers, modifiers.c.id == action_modifiers.c.modifier_id)
+        ).where(and_(*[criterion(fields) for criterion in criteria])).\
+            order_by(fields.c.match_id, fields.c.period, fields.c.period_secs)
+
+    def table(self, statement):
+        """
+        Build an Arrow table in the event store schema from query results.
+
+        :param statement: Select statement from :meth:`query`.
+        :return: Arrow table.
+        """
+        records = self.session.execute(statement).fetchall()
+        columns = []
+        for indx, (field, field_type) in enumerate(EVENT_STORE_FIELDS.items()):
+            values = [record[indx] for record in records]
+            if isinstance(field_type, list):
+                values = [None if value is None else value.value for value in values]
+            columns.append(arrow_column(values, field_type))
+        return pa.Table.from_arrays(columns, list(EVENT_STORE_FIELDS))
+
+    def write(self, statement, path):
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        table = self.table(statement)
+        pq.write_table(table, path)
+        logger.info("Wrote {} rows to {}".format(table.num_rows, path))
+        return path
+
+    def export_match(self, match_id):
+        """
+        Write event store file of a match.
+
+        :param match_id: Match ID.
+        :return: Path of file.
+        """
+        return self.write(self.query(lambda fields: fields.c.match_id == match_id),
+                          self.path('matches', str(match_id)))
+
+    def export_season(self, competition_id, season_id):
+        """
+        Write event store file of all matches of a competition in a season.
+
+        :param competition_id: Competition ID.
+        :param season_id: Season ID.
+        :return: Path of file.
+        """
+        match_ids = select([mcm.Matches.id]).where(and_(mcm.Matches.competition_id == competition_id,
+                                                        mcm.Matches.season_id == season_id))
+        return self.write(self.query(lambda fields: fields.c.match_id.in_(match_ids)),
+                          self.path('seasons', '{}-{}'.format(competition_id, season_id)))
+
+    def read_match(self, match_id):
+        return read_events(self.path('matches', str(match_id)))
+
+    def read_season(self, competition_id, season_id):
+        return read_events(self.path('seasons', '{}-{}'.format(competition_id, season_id)))
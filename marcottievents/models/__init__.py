@@ -1,27 +1,39 @@
 import re
 import uuid
+import logging
+from collections import OrderedDict
 
-from sqlalchemy.sql import table
+from sqlalchemy import Column, MetaData, Table, event, inspect
+from sqlalchemy.sql import table, column, select, bindparam
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.ext import compiler
-from sqlalchemy.schema import DDLElement
+from sqlalchemy.schema import DDL, DDLElement, CreateTable, ForeignKeyConstraint, PrimaryKeyConstraint
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.types import SchemaType, TypeDecorator, Enum, BINARY
+from sqlalchemy.types import SchemaType, TypeDecorator, Enum, BINARY, LargeBinary
+
+
+logger = logging.getLogger(__name__)
+
+VIEWS = OrderedDict()
 
 
 class CreateView(DDLElement):
-    def __init__(self, name, select):
+    def __init__(self, name, select, materialized=False):
         self.name = name
         self.select = select
+        self.materialized = materialized
 
 
 class DropView(DDLElement):
-    def __init__(self, name):
+    def __init__(self, name, materialized=False):
         self.name = name
+        self.materialized = materialized
 
 
 @compiler.compiles(CreateView)
 def create_view(element, compiler, **kw):
-    return "CREATE VIEW {name} as {expr}".format(
+    return "CREATE {kind} {name} as {expr}".format(
+        kind="TABLE" if element.materialized else "VIEW",
         name=element.name,
         expr=compiler.sql_compiler.process(element.select)
     )
@@ -29,24 +41,183 @@ def create_view(element, compiler, **kw):
 
 @compiler.compiles(DropView)
 def drop_view(element, compiler, **kw):
-    return "DROP VIEW {name}".format(name=element.name)
+    return "DROP {kind} {name}".format(kind="TABLE" if element.materialized else "VIEW", name=element.name)
+
+
+def view_exists(name, bind, materialized):
+    """
+    Check if a view, or a summary table that materializes it, exists in the database.
+
+    :param name: Name of view.
+    :param bind: Database connection.
+    :param materialized: If True, check for a summary table, otherwise for a view.
+    :return: True if it exists.
+    """
+    inspector = inspect(bind)
+    return name in (inspector.get_table_names() if materialized else inspector.get_view_names())
 
 
 def view(name, metadata, selectable):
+    """
+    Define a view of the Marcotti schema.
+
+    The view is created with the tables of the schema.  If the `materialized_views` entry of the
+    metadata's `info` dictionary is set, the view is created as a summary table instead, with an
+    index on `match_id`, which is kept up to date with :func:`refresh_views`.
+
+    :param name: Name of view.
+    :param metadata: MetaData object of the Marcotti schema.
+    :param selectable: Select statement that defines the view.
+    :return: :class:`TableClause` object of the view.
+    """
     t = table(name)
 
     for c in selectable.c:
         c._make_proxy(t)
 
-    CreateView(name, selectable).execute_at('after-create', metadata)
-    DropView(name).execute_at('before-drop', metadata)
+    def is_materialized(ddl, target, bind, **kw):
+        return target.info.get('materialized_views', False)
+
+    def create_if(ddl, target, bind, **kw):
+        return ddl.materialized == is_materialized(ddl, target, bind) and \
+            not any(view_exists(name, bind, materialized) for materialized in [False, True])
+
+    def drop_if(ddl, target, bind, **kw):
+        return view_exists(name, bind, ddl.materialized)
+
+    def index_if(ddl, target, bind, **kw):
+        return is_materialized(ddl, target, bind) and \
+            '{}_match_indx'.format(name) not in [index['name'] for index in inspect(bind).get_indexes(name)]
+
+    for materialized in [False, True]:
+        event.listen(metadata, 'after_create',
+                     CreateView(name, selectable, materialized).execute_if(callable_=create_if))
+        event.listen(metadata, 'before_drop', DropView(name, materialized).execute_if(callable_=drop_if))
+    event.listen(metadata, 'after_create',
+                 DDL("CREATE INDEX {0}_match_indx ON {0} (match_id)".format(name)).execute_if(callable_=index_if))
+    VIEWS[name] = (t, selectable)
     return t
 
 
+def materialized_views(bind):
+    """
+    Retrieve views of the Marcotti schema that are materialized as summary tables in the database.
+
+    :param bind: Database connection.
+    :return: List of view names.
+    """
+    table_names = set(inspect(bind).get_table_names())
+    return [name for name in VIEWS if name in table_names]
+
+
+def refresh_views(bind, names, match_ids=None):
+    """
+    Refresh summary tables of materialized views by replacing their rows for the given matches.
+
+    :param bind: Database connection or session.
+    :param names: Names of materialized views.
+    :param match_ids: Match IDs whose rows are refreshed, or None to refresh all rows.
+    """
+    for name in names:
+        summary, selectable = VIEWS[name]
+        source = selectable.alias()
+        delete_stmt = summary.delete()
+        insert_query = select(list(source.c))
+        if match_ids is not None:
+            match_ids = list(match_ids)
+            delete_stmt = delete_stmt.where(summary.c.match_id.in_(match_ids))
+            insert_query = insert_query.where(source.c.match_id.in_(match_ids))
+        bind.execute(delete_stmt)
+        bind.execute(summary.insert().from_select([c.name for c in source.c], insert_query))
+
+
+PARTITION_KEYS = OrderedDict()
+
+
+def hash_partition(tbl, key):
+    """
+    Declare a table to be hash-partitioned on a column in PostgreSQL databases.
+
+    Partitioning takes effect if the `partitions` entry of the metadata's `info` dictionary is set to
+    the number of partitions when the schema is created.  The partition key becomes part of the
+    table's primary key, as PostgreSQL requires unique constraints of partitioned tables to include
+    the partition key.  For the same reason, foreign keys that refer to the table are extended with
+    the partition key if the referring table has a column of that name, and are not created otherwise.
+
+    :param tbl: Table object.
+    :param key: Name of partition key column, which must not be nullable.
+    """
+    if tbl.c[key].nullable:
+        raise ValueError("Partition key {}.{} must not be nullable".format(tbl.name, key))
+    PARTITION_KEYS[tbl.name] = key
+    event.listen(tbl, 'after_create', create_partitions)
+
+
+def create_partitions(target, connection, **kw):
+    partitions = target.metadata.info.get('partitions')
+    if partitions and connection.dialect.name == 'postgresql':
+        for remainder in range(partitions):
+            connection.execute(
+                "CREATE TABLE {0}_p{1} PARTITION OF {0} FOR VALUES WITH (MODULUS {2}, REMAINDER {1})".format(
+                    target.name, remainder, partitions))
+
+
+def partitioned_constraints(tbl):
+    """
+    Retrieve the table constraints of a table in a partitioned schema.
+
+    The primary key of a partitioned table is extended with its partition key, and foreign keys to
+    partitioned tables are replaced with foreign keys that include the partition key.  The new
+    constraints are attached to a copy of the table's columns, so that the table itself is unchanged.
+
+    :param tbl: Table object.
+    :return: List of constraint objects, primary key first.
+    """
+    columns = Table(tbl.name, MetaData(), *[Column(col.name, col.type) for col in tbl.columns])
+    primary_key = tbl.primary_key
+    if tbl.name in PARTITION_KEYS:
+        primary_key = PrimaryKeyConstraint(*[col.name for col in tbl.primary_key] + [PARTITION_KEYS[tbl.name]],
+                                           name=tbl.primary_key.name)
+        columns.append_constraint(primary_key)
+    constraints = [primary_key]
+    for constraint in tbl._sorted_constraints:
+        if constraint is tbl.primary_key:
+            continue
+        if isinstance(constraint, ForeignKeyConstraint) and constraint.referred_table.name in PARTITION_KEYS:
+            referred = constraint.referred_table
+            key = PARTITION_KEYS[referred.name]
+            if key not in tbl.c:
+                logger.warning("Foreign key {}({}) to partitioned table {} not created".format(
+                    tbl.name, ', '.join(constraint.column_keys), referred.name))
+                continue
+            constraint = ForeignKeyConstraint(
+                constraint.column_keys + [key],
+                [element.column for element in constraint.elements] + [referred.c[key]],
+                name=constraint.name, ondelete=constraint.ondelete, onupdate=constraint.onupdate)
+            columns.append_constraint(constraint)
+        constraints.append(constraint)
+    return constraints
+
+
+@compiler.compiles(CreateTable, 'postgresql')
+def create_partitioned_table(create, compiler, **kw):
+    tbl = create.element
+    if not tbl.metadata.info.get('partitions'):
+        return compiler.visit_create_table(create)
+    definitions = [compiler.process(create_column) for create_column in create.columns] + \
+        [compiler.process(constraint) for constraint in partitioned_constraints(tbl)
+         if constraint._create_rule is None or constraint._create_rule(compiler)]
+    text = "\nCREATE TABLE {} (\n\t{}\n)".format(
+        compiler.preparer.format_table(tbl), ", \n\t".join(item for item in definitions if item))
+    if tbl.name in PARTITION_KEYS:
+        text += " PARTITION BY HASH ({})".format(compiler.preparer.quote(PARTITION_KEYS[tbl.name]))
+    return text + "\n\n"
+
+
 class GUID(TypeDecorator):
     """Platform-independent GUID type.
 
-    Uses Postgresql's UUID type, otherwise uses BINARY(32) to store UUID.
+    Uses Postgresql's UUID type, otherwise uses BINARY(16) to store the 16 raw bytes of the UUID.
 
     References:
     [1] http://docs.sqlalchemy.org/en/latest/core/custom_types.html#backend-agnostic-guid-type
@@ -59,37 +230,98 @@ class GUID(TypeDecorator):
         if dialect.name == 'postgresql':
             return dialect.type_descriptor(UUID())
         else:
-            return dialect.type_descriptor(BINARY(32))
+            return dialect.type_descriptor(BINARY(16))
+
+    @staticmethod
+    def to_uuid(value):
+        """
+        Convert UUID object, 16-byte string, integer, or hex string (with or without hyphens) to UUID object.
+
+        :param value: UUID representation.
+        :return: :class:`uuid.UUID` object.
+        """
+        if isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (int, long)):
+            return uuid.UUID(int=value)
+        if isinstance(value, (bytes, bytearray, buffer)) and len(value) == 16:
+            return uuid.UUID(bytes=bytes(value))
+        if isinstance(value, (bytearray, buffer)):
+            value = bytes(value)
+        return uuid.UUID(value.rstrip('\x00') if isinstance(value, bytes) else value)
 
     def process_bind_param(self, value, dialect):
         if value is None:
             return value
-        else:
-            if not isinstance(value, uuid.UUID):
-                if isinstance(value, bytes):
-                    value = uuid.UUID(bytes=value)
-                elif isinstance(value, int):
-                    value = uuid.UUID(int=value)
-                elif isinstance(value, str):
-                    value = uuid.UUID(value)
+        value = self.to_uuid(value)
         if dialect.name == 'postgresql':
             return value.hex
         else:
-            return "%.32x" % value.bytes
+            return value.bytes
 
     def process_result_value(self, value, dialect):
         if value is None:
             return value
-        if dialect.name == "postgresql":
-            return uuid.UUID(value)
-        else:
-            return uuid.UUID(bytes=value)
+        return self.to_uuid(value)
 
     @staticmethod
     def is_mutable():
         return False
 
 
+class raw_guid(FunctionElement):
+    """
+    GUID column selected without conversion to UUID objects: as hex text on PostgreSQL, and as the
+    stored 16 bytes on other databases.  Values identify GUIDs and can be converted with
+    :meth:`GUID.to_uuid`.
+    """
+    type = LargeBinary()
+    name = 'raw_guid'
+
+
+@compiler.compiles(raw_guid)
+def compile_raw_guid(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiler.compiles(raw_guid, 'postgresql')
+def compile_raw_guid_postgresql(element, compiler, **kw):
+    return "CAST({} AS TEXT)".format(compiler.process(element.clauses, **kw))
+
+
+def convert_guids(connection, metadata):
+    """
+    Convert GUID values stored as 32-character hex strings into 16-byte binary values.
+
+    Databases other than PostgreSQL created with earlier versions of the GUID type hold hex text in
+    their GUID columns.  Every primary and foreign key column is converted in place, one distinct
+    value at a time.  On databases with static column types (e.g. MySQL) the columns must be
+    altered to BINARY(16) afterwards.
+
+    :param connection: Database connection.
+    :param metadata: MetaData object of the Marcotti schema.
+    :return: Number of values converted.
+    """
+    if connection.dialect.name == 'postgresql':
+        return 0
+    converted = 0
+    for tbl in metadata.sorted_tables:
+        for col in tbl.columns:
+            if not isinstance(col.type, GUID):
+                continue
+            raw_col = column(col.name)
+            raw_table = table(tbl.name, raw_col)
+            statement = raw_table.update().where(raw_col == bindparam('old')).values(
+                {col.name: bindparam('new', type_=LargeBinary)})
+            values = [rec[0] for rec in connection.execute(select([raw_col]).select_from(raw_table).distinct())]
+            for value in values:
+                if value is None or len(value) == 16:
+                    continue
+                connection.execute(statement, old=value, new=GUID.to_uuid(value).bytes)
+                converted += 1
+    return converted
+
+
 class EnumSymbol(object):
     """Define a fixed symbol tied to a parent class."""
 
@@ -29,7 +29,7 @@ class Clubs(ClubSchema):
     country_id = Column(GUID, ForeignKey('countries.id'))
     country = relationship('Countries', backref=backref('clubs'))
 
-    Index('clubs_indx', 'name', 'country_id')
+    __table_args__ = (Index('clubs_indx', 'name', 'country_id'),)
 
     def __repr__(self):
         return u"<Club(name={0}, short_name={1}, country={2})>".format(
@@ -41,6 +41,7 @@ class Clubs(ClubSchema):
 
 class ClubMap(BaseSchema):
     __tablename__ = "club_mapper"
+    __table_args__ = (Index('club_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('clubs.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -129,16 +130,16 @@ class ClubFriendlyMatches(FriendlyMixin, ClubMatchMixin, ClubSchema, mcm.Matches
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('club_friendly_indx', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('club_friendly_indx', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<ClubFriendlyMatch(home={}, away={}, competition={}, date={})>".format(
-            self.home_team.name, self.away_team.name, self.competition.name, self.date.isoformat()
+            self.home_team.name, self.away_team.name, self.competition.name, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<ClubFriendlyMatch(home={}, away={}, competition={}, date={})>".format(
-            self.home_team.name, self.away_team.name, self.competition.name, self.date.isoformat()
+            self.home_team.name, self.away_team.name, self.competition.name, self.match_date.isoformat()
         )
 
 
@@ -148,16 +149,16 @@ class ClubLeagueMatches(LeagueMixin, ClubMatchMixin, ClubSchema, mcm.LeagueMatch
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('club_league_indx', 'matchday', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('club_league_indx', 'matchday', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<ClubLeagueMatch(home={}, away={}, competition={}, matchday={}, date={})>".format(
-            self.home_team.name, self.away_team.name, self.competition.name, self.matchday, self.date.isoformat()
+            self.home_team.name, self.away_team.name, self.competition.name, self.matchday, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<ClubLeagueMatch(home={}, away={}, competition={}, matchday={}, date={})>".format(
-            self.home_team.name, self.away_team.name, self.competition.name, self.matchday, self.date.isoformat()
+            self.home_team.name, self.away_team.name, self.competition.name, self.matchday, self.match_date.isoformat()
         )
 
 
@@ -167,18 +168,18 @@ class ClubGroupMatches(GroupMixin, ClubMatchMixin, ClubSchema, mcm.GroupMatches,
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('club_group_indx', 'group_round', 'group', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('club_group_indx', 'group_round', 'group', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<ClubGroupMatch(home={}, away={}, competition={}, round={}, group={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name, self.group_round.value,
-            self.group, self.matchday, self.date.isoformat()
+            self.group, self.matchday, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<ClubGroupMatch(home={}, away={}, competition={}, round={}, group={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name, self.group_round.value,
-            self.group, self.matchday, self.date.isoformat()
+            self.group, self.matchday, self.match_date.isoformat()
         )
 
 
@@ -188,18 +189,18 @@ class ClubKnockoutMatches(KnockoutMixin, ClubMatchMixin, ClubSchema, mcm.Knockou
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('club_knockout_indx', 'ko_round', 'matchday', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('club_knockout_indx', 'ko_round', 'matchday', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<ClubKnockoutMatch(home={}, away={}, competition={}, round={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name,
-            self.ko_round.value, self.matchday, self.date.isoformat()
+            self.ko_round.value, self.matchday, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<ClubKnockoutMatch(home={}, away={}, competition={}, round={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name,
-            self.ko_round.value, self.matchday, self.date.isoformat()
+            self.ko_round.value, self.matchday, self.match_date.isoformat()
         )
 
 
@@ -1,10 +1,12 @@
 import uuid
 
-from sqlalchemy import Column, Boolean, Integer, Numeric, String, Sequence, ForeignKey, Index
+from sqlalchemy import Column, Boolean, Integer, Numeric, String, Sequence, ForeignKey, Index, func, inspect, select
+from sqlalchemy.event import listens_for
 from sqlalchemy.schema import CheckConstraint
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm import relationship, backref, with_polymorphic
+from sqlalchemy.sql.expression import label, null
 
-from marcottievents.models import GUID
+from marcottievents.models import GUID, hash_partition
 from marcottievents.models.common import BaseSchema
 import marcottievents.models.common.enums as enums
 
@@ -21,10 +23,10 @@ class MatchEvents(BaseSchema):
     x = Column(Numeric(4, 1, asdecimal=False, decimal_return_scale=1), nullable=True)
     y = Column(Numeric(4, 1, asdecimal=False, decimal_return_scale=1), nullable=True)
 
-    match_id = Column(GUID, ForeignKey('matches.id'))
+    match_id = Column(GUID, ForeignKey('matches.id'), nullable=False)
     match = relationship('Matches', backref=backref('events'))
 
-    Index('match_events_indx', 'match_id', 'period', 'period_secs')
+    __table_args__ = (Index('match_events_indx', 'match_id', 'period', 'period_secs'),)
 
     __mapper_args__ = {
         'polymorphic_identity': 'events',
@@ -46,12 +48,51 @@ class MatchActions(BaseSchema):
     event_id = Column(GUID, ForeignKey('match_events.id'), nullable=False)
     lineup_id = Column(GUID, ForeignKey('lineups.id'))
 
-    Index('match_actions_indx', 'event_id', 'type')
+    match_id = Column(GUID, ForeignKey('matches.id'), nullable=False, doc="Copy of match of event")
+    team_id = Column(GUID, doc="Copy of team of club or national team event")
+    period = Column(Integer, doc="Copy of match period of event")
+    period_secs = Column(Integer, doc="Copy of time of event in match period")
+
+    __table_args__ = (Index('match_actions_indx', 'event_id', 'type'),
+                      Index('match_actions_match_indx', 'match_id', 'period', 'period_secs'))
 
     event = relationship('MatchEvents', backref=backref('actions'))
     lineup = relationship('MatchLineups', backref=backref('actions'))
 
 
+def event_fields():
+    """
+    Select match event fields that are copied to match actions.  The team ID is read from the
+    club or national team event tables.
+
+    :return: Select statement of event ID, match ID, team ID, period and period seconds.
+    """
+    events = with_polymorphic(MatchEvents, '*')
+    teams = [getattr(events, mapper.class_.__name__).team_id for mapper in MatchEvents.__mapper__.self_and_descendants
+             if 'team_id' in mapper.columns]
+    team_id = teams[0] if len(teams) == 1 else func.coalesce(*teams) if teams else null()
+    return select([events.id, events.match_id, label('team_id', team_id), events.period, events.period_secs],
+                  from_obj=[inspect(events).selectable])
+
+
+@listens_for(MatchActions, 'before_insert')
+def copy_event_fields(mapper, connection, target):
+    """
+    Copy the fields of its match event to a match action that is created without a match ID.
+    """
+    if target.match_id is None:
+        fields = event_fields().alias()
+        record = connection.execute(fields.select().where(fields.c.id == target.event_id)).first()
+        if record is not None:
+            for field in ['match_id', 'team_id', 'period', 'period_secs']:
+                if getattr(target, field) is None:
+                    setattr(target, field, record[field])
+
+
+hash_partition(MatchEvents.__table__, 'match_id')
+hash_partition(MatchActions.__table__, 'match_id')
+
+
 class MatchActionModifiers(BaseSchema):
     __tablename__ = 'action_modifiers'
 
@@ -37,7 +37,7 @@ class Matches(BaseSchema):
     home_manager = relationship('Managers', foreign_keys=[home_manager_id], backref=backref('home_matches'))
     away_manager = relationship('Managers', foreign_keys=[away_manager_id], backref=backref('away_matches'))
 
-    Index('match_indx', 'match_date', 'competition_id', 'season_id')
+    __table_args__ = (Index('match_indx', 'match_date', 'competition_id', 'season_id'),)
 
     __mapper_args__ = {
         'polymorphic_identity': 'matches',
@@ -124,7 +124,7 @@ class MatchLineups(BaseSchema):
     player = relationship('Players', backref=backref('lineups'))
     position = relationship('Positions')
 
-    Index('lineups_indx', 'match_id', 'player_id', 'position_id')
+    __table_args__ = (Index('lineups_indx', 'match_id', 'player_id', 'position_id'),)
 
     __mapper_args__ = {
         'polymorphic_identity': 'lineups',
@@ -25,7 +25,7 @@ class Countries(BaseSchema):
     code = Column(String(3))
     confederation = Column(enums.ConfederationType.db_type())
 
-    Index('countries_indx', 'name')
+    __table_args__ = (Index('countries_indx', 'name'),)
 
     def __repr__(self):
         return u"<Country(id={0}, name={1}, trigram={2}, confed={3})>".format(
@@ -41,7 +41,7 @@ class Years(BaseSchema):
     id = Column(Integer, Sequence('year_id_seq', start=100), primary_key=True)
     yr = Column(Integer, unique=True)
 
-    Index('years_indx', 'yr')
+    __table_args__ = (Index('years_indx', 'yr'),)
 
     def __repr__(self):
         return "<Year(yr={0})>".format(self.yr)
@@ -61,7 +61,7 @@ class Seasons(BaseSchema):
     start_year = relationship('Years', foreign_keys=[start_year_id])
     end_year = relationship('Years', foreign_keys=[end_year_id])
 
-    Index('seasons_indx', 'start_year_id', 'end_year_id')
+    __table_args__ = (Index('seasons_indx', 'start_year_id', 'end_year_id'),)
 
     @hybrid_property
     def name(self):
@@ -122,7 +122,7 @@ class Competitions(BaseSchema):
     level = Column(Integer)
     discriminator = Column('type', String(20))
 
-    Index('competitions_indx', 'name', 'level')
+    __table_args__ = (Index('competitions_indx', 'name', 'level'),)
 
     __mapper_args__ = {
         'polymorphic_identity': 'competitions',
@@ -176,7 +176,7 @@ class Venues(BaseSchema):
     timezone_id = Column(Integer, ForeignKey('timezones.id'))
     timezone = relationship('Timezones', backref=backref('venues'))
 
-    Index('venues_indx', 'name', 'city', 'country_id')
+    __table_args__ = (Index('venues_indx', 'name', 'city', 'country_id'),)
 
     def __repr__(self):
         return u"<Venue(name={0}, city={1}, country={2})>".format(
@@ -217,7 +217,7 @@ class Timezones(BaseSchema):
     offset = Column(Numeric(4, 2), doc="Offset of the time zone region from UTC, in decimal hours", nullable=False)
     confederation = Column(enums.ConfederationType.db_type())
 
-    Index('timezones_indx', 'name')
+    __table_args__ = (Index('timezones_indx', 'name'),)
 
     def __repr__(self):
         return u"<Timezone(name={0}, offset={1:+1.2f}, confederation={2})>".format(
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Integer, Numeric, String, Sequence, Date, ForeignKey, Unicode, Index
+from sqlalchemy import Column, Integer, Numeric, String, Sequence, Date, ForeignKey, Unicode, Index, event
 from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.schema import CheckConstraint
@@ -42,10 +42,13 @@ class Persons(BaseSchema):
     order = Column(enums.NameOrderType.db_type(), default=enums.NameOrderType.western)
     type = Column(String)
 
+    stored_full_name = Column('full_name', Unicode(160))
+
     country_id = Column(GUID, ForeignKey('countries.id'))
     country = relationship('Countries', backref=backref('persons'))
 
-    Index('persons_indx', 'first_name', 'middle_name', 'last_name', 'nick_name')
+    __table_args__ = (Index('persons_indx', 'first_name', 'middle_name', 'last_name', 'nick_name'),
+                      Index('persons_name_indx', 'full_name'))
 
     __mapper_args__ = {
         'polymorphic_identity': 'persons',
@@ -67,13 +70,13 @@ class Persons(BaseSchema):
         if all([self.nick_name is not None, self.nick_name != u'']):
             return self.nick_name
         else:
-            if self.order == enums.NameOrderType.western:
-                return u"{} {}".format(self.known_first_name or self.first_name, self.last_name)
-            elif self.order == enums.NameOrderType.middle:
+            if self.order == enums.NameOrderType.middle:
                 return u"{} {} {}".format(self.known_first_name or self.first_name,
                                           self.middle_name, self.last_name)
             elif self.order == enums.NameOrderType.eastern:
                 return u"{} {}".format(self.last_name, self.first_name)
+            else:
+                return u"{} {}".format(self.known_first_name or self.first_name, self.last_name)
 
     @full_name.expression
     def full_name(cls):
@@ -169,6 +172,16 @@ class Persons(BaseSchema):
             self.full_name, self.country.name, self.birth_date.isoformat()).encode('utf-8')
 
 
+@event.listens_for(Persons, 'before_insert', propagate=True)
+@event.listens_for(Persons, 'before_update', propagate=True)
+def store_full_name(mapper, connection, target):
+    """
+    Keep stored full name of person in sync with name fields.  Bulk operations do not fire this
+    event, so bulk loaders set the stored full name themselves.
+    """
+    target.stored_full_name = target.full_name
+
+
 class Players(Persons):
     """
     Players data model.
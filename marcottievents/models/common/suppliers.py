@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Unicode, ForeignKey, Sequence
+from sqlalchemy import Column, Integer, String, Unicode, ForeignKey, Sequence, Index
 from sqlalchemy.orm import relationship, backref
 
 from marcottievents.models import GUID
@@ -18,6 +18,7 @@ class Suppliers(BaseSchema):
 
 class CountryMap(BaseSchema):
     __tablename__ = "country_mapper"
+    __table_args__ = (Index('country_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('countries.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -32,6 +33,7 @@ class CountryMap(BaseSchema):
 
 class CompetitionMap(BaseSchema):
     __tablename__ = "competition_mapper"
+    __table_args__ = (Index('competition_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('competitions.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -46,6 +48,7 @@ class CompetitionMap(BaseSchema):
 
 class SeasonMap(BaseSchema):
     __tablename__ = "season_mapper"
+    __table_args__ = (Index('season_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(Integer, ForeignKey('seasons.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -60,6 +63,7 @@ class SeasonMap(BaseSchema):
 
 class VenueMap(BaseSchema):
     __tablename__ = "venue_mapper"
+    __table_args__ = (Index('venue_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('venues.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -74,6 +78,7 @@ class VenueMap(BaseSchema):
 
 class PlayerMap(BaseSchema):
     __tablename__ = "player_mapper"
+    __table_args__ = (Index('player_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('players.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -88,6 +93,7 @@ class PlayerMap(BaseSchema):
 
 class ManagerMap(BaseSchema):
     __tablename__ = "manager_mapper"
+    __table_args__ = (Index('manager_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('managers.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -102,6 +108,7 @@ class ManagerMap(BaseSchema):
 
 class RefereeMap(BaseSchema):
     __tablename__ = "referee_mapper"
+    __table_args__ = (Index('referee_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('referees.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -116,6 +123,7 @@ class RefereeMap(BaseSchema):
 
 class PositionMap(BaseSchema):
     __tablename__ = "position_mapper"
+    __table_args__ = (Index('position_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(Integer, ForeignKey('positions.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -130,6 +138,7 @@ class PositionMap(BaseSchema):
 
 class MatchMap(BaseSchema):
     __tablename__ = "match_mapper"
+    __table_args__ = (Index('match_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -144,6 +153,7 @@ class MatchMap(BaseSchema):
 
 class MatchEventMap(BaseSchema):
     __tablename__ = "event_mapper"
+    __table_args__ = (Index('event_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(GUID, ForeignKey('match_events.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -158,6 +168,7 @@ class MatchEventMap(BaseSchema):
 
 class ActionMap(BaseSchema):
     __tablename__ = "action_type_mapper"
+    __table_args__ = (Index('action_type_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(enums.ActionType.db_type(), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
@@ -172,6 +183,7 @@ class ActionMap(BaseSchema):
 
 class ModifierMap(BaseSchema):
     __tablename__ = "modifier_type_mapper"
+    __table_args__ = (Index('modifier_type_mapper_indx', 'supplier_id', 'remote_id', unique=True),)
 
     id = Column(Integer, ForeignKey('modifiers.id'), primary_key=True)
     remote_id = Column(String, nullable=False, primary_key=True)
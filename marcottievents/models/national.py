@@ -80,16 +80,16 @@ class NationalFriendlyMatches(FriendlyMixin, NationalMatchMixin, NatlSchema, mcm
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('natl_friendly_indx', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('natl_friendly_indx', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<NationalFriendlyMatch(home={}, away={}, competition={}, date={})>".format(
-            self.home_team.name, self.away_team.name, self.competition.name, self.date.isoformat()
+            self.home_team.name, self.away_team.name, self.competition.name, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<NationalFriendlyMatch(home={}, away={}, competition={}, date={})>".format(
-            self.home_team.name, self.away_team.name, self.competition.name, self.date.isoformat()
+            self.home_team.name, self.away_team.name, self.competition.name, self.match_date.isoformat()
         )
 
 
@@ -99,18 +99,18 @@ class NationalGroupMatches(GroupMixin, NationalMatchMixin, NatlSchema, mcm.Group
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('natl_group_indx', 'group_round', 'group', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('natl_group_indx', 'group_round', 'group', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<NationalGroupMatch(home={}, away={}, competition={}, round={}, group={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name, self.group_round.value,
-            self.group, self.matchday, self.date.isoformat()
+            self.group, self.matchday, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<NationalGroupMatch(home={}, away={}, competition={}, round={}, group={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name, self.group_round.value,
-            self.group, self.matchday, self.date.isoformat()
+            self.group, self.matchday, self.match_date.isoformat()
         )
 
 
@@ -120,18 +120,18 @@ class NationalKnockoutMatches(KnockoutMixin, NationalMatchMixin, NatlSchema, mcm
 
     id = Column(GUID, ForeignKey('matches.id'), primary_key=True)
 
-    Index('natl_knockout_indx', 'ko_round', 'matchday', 'home_team_id', 'away_team_id')
+    __table_args__ = (Index('natl_knockout_indx', 'ko_round', 'matchday', 'home_team_id', 'away_team_id'),)
 
     def __repr__(self):
         return u"<NationalKnockoutMatch(home={}, away={}, competition={}, round={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name,
-            self.ko_round.value, self.matchday, self.date.isoformat()
+            self.ko_round.value, self.matchday, self.match_date.isoformat()
         ).encode('utf-8')
 
     def __unicode__(self):
         return u"<NationalKnockoutMatch(home={}, away={}, competition={}, round={}, matchday={}, date={})>".format(
             self.home_team.name, self.away_team.name, self.competition.name,
-            self.ko_round.value, self.matchday, self.date.isoformat()
+            self.ko_round.value, self.matchday, self.match_date.isoformat()
         )
 
 
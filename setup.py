@@ -36,7 +36,8 @@ setup(
         'MySQL': ['mysql-python>=1.2.3'],
         'MSSQL': ['pyodbc>=3.0'],
         'Oracle': ['cx_oracle>=5.0'],
-        'Firebird': ['fdb>=1.6']
+        'Firebird': ['fdb>=1.6'],
+        'Parquet': ['pyarrow>=0.15.0']
     },
     tests_require=['pytest>=2.8.2'],
     description='Data modeling software library for capture of micro events in football matches',
@@ -5,12 +5,23 @@ from datetime import date, time
 
 import pytest
 
+from marcottievents import MarcottiConfig
 import marcottievents.models.common.enums as enums
 import marcottievents.models.common.overview as mco
 import marcottievents.models.common.personnel as mcp
 import marcottievents.models.club as mc
 
 
+class SQLiteConfig(MarcottiConfig):
+    DIALECT = 'sqlite'
+    DBNAME = ''
+
+
+@pytest.fixture
+def sqlite_config():
+    return SQLiteConfig()
+
+
 @pytest.fixture
 def comp_data():
     return {
@@ -182,7 +193,7 @@ def match_condition_data():
 @pytest.fixture
 def match_data(comp_data, season_data, venue_data, person_data):
     return {
-        "date": date(2012, 12, 12),
+        "match_date": date(2012, 12, 12),
         "competition": mco.DomesticCompetitions(**comp_data['domestic']),
         "season": mco.Seasons(**{k: mco.Years(**v) for k, v in season_data.items()}),
         "venue": mco.Venues(**venue_data),
@@ -198,7 +209,7 @@ def club_data():
     france = mco.Countries(name=u"France", confederation=enums.ConfederationType.europe)
     tz_london = mco.Timezones(name=u"Europe/London", offset=0.0, confederation=enums.ConfederationType.europe)
     return {
-        'date': date(2015, 1, 1),
+        'match_date': date(2015, 1, 1),
         'competition': mco.DomesticCompetitions(name=u'Test Competition', level=1, country=england),
         'season': mco.Seasons(start_year=mco.Years(yr=2014), end_year=mco.Years(yr=2015)),
         'venue': mco.Venues(name=u"Emirates Stadium", city=u"London", country=england, timezone=tz_london),
@@ -221,7 +232,7 @@ def national_data():
     italy = mco.Countries(name=u"Italy", confederation=enums.ConfederationType.europe)
     tz_london = mco.Timezones(name=u"Europe/London", offset=0.0, confederation=enums.ConfederationType.europe)
     return {
-        'date': date(1997, 11, 12),
+        'match_date': date(1997, 11, 12),
         'competition': mco.InternationalCompetitions(name=u"International Cup", level=1,
                                                      confederation=enums.ConfederationType.fifa),
         'season': mco.Seasons(start_year=mco.Years(yr=1997), end_year=mco.Years(yr=1998)),
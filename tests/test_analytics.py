@@ -0,0 +1,289 @@
+# coding=utf-8
+import os
+import uuid
+import random
+from collections import namedtuple
+
+import pandas as pd
+import pytest
+from sqlalchemy.orm.session import Session
+
+from marcottievents import Marcotti
+from marcottievents.lib.match import (MatchAnalytics, coroutine, parse_possessions_alt, period_starts,
+                                       play_classes, play_segments, effective_play, Possession)
+from marcottievents.lib.parallel import ParallelAnalytics
+from marcottievents.lib.sinks import MemorySink
+from marcottievents.models.club import ClubSchema
+import marcottievents.models.club as mc
+import marcottievents.models.common.enums as enums
+import marcottievents.models.common.events as mce
+import marcottievents.models.common.suppliers as mcs
+
+
+def test_validate_denormalized_actions(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_id, team_id = uuid.uuid4(), uuid.uuid4()
+    event_ids = [uuid.uuid4() for _ in range(6)]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=match_id, period=1 + indx % 2, period_secs=60 * indx)
+            for indx, event_id in enumerate(event_ids)])
+        marcotti.connection.execute(mc.ClubMatchEvents.__table__.insert(), [
+            dict(id=event_id, team_id=team_id) for event_id in event_ids])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event_id, is_success=False,
+                 type=enums.ActionType.from_string("End Period" if indx > 3 else "Foul"),
+                 match_id=match_id, team_id=team_id, period=1 + indx % 2, period_secs=60 * indx)
+            for indx, event_id in enumerate(event_ids)])
+    assert marcotti.validate_actions() == 0
+
+    actions = mce.MatchActions.__table__
+    marcotti.connection.execute(actions.update().where(actions.c.event_id == event_ids[0]).
+                                values(period_secs=None))
+    marcotti.connection.execute(actions.update().where(actions.c.event_id == event_ids[1]).
+                                values(period=2, team_id=None))
+    assert marcotti.validate_actions() == 2
+    assert marcotti.validate_actions(repair=True) == 2
+    assert marcotti.validate_actions() == 0
+
+    session = Session(marcotti.connection)
+    results = []
+    for denormalized in [False, True]:
+        analytics = MatchAnalytics(session)
+        analytics.DENORMALIZED_ACTIONS = denormalized
+        results.append((sorted(analytics.match_length(match_id)), analytics.foul_times(match_id, 1),
+                        analytics.stoppage_times(match_id, 2)))
+    assert results[0] == results[1] == ([(1, 240), (2, 300)], [0, 120], [60, 180])
+
+
+def test_batched_match_analytics(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_ids = [uuid.uuid4() for _ in range(3)]
+    action_types = ["Foul", "Throw-In", "Foul", "Out of Play", "Goal", "Foul", "End Period"]
+    events, actions = [], []
+    for match_indx, match_id in enumerate(match_ids[:2]):
+        for period in [1, 2]:
+            for indx, action_type in enumerate(action_types[match_indx:]):
+                event_id = uuid.uuid4()
+                secs = 100 * (indx - (action_type == "Out of Play")) + 7 * period * match_indx
+                events.append(dict(id=event_id, domain='club', match_id=match_id, period=period,
+                                   period_secs=secs))
+                actions.append(dict(id=uuid.uuid4(), event_id=event_id, is_success=False,
+                                    type=enums.ActionType.from_string(action_type),
+                                    match_id=match_id, period=period, period_secs=secs))
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), events)
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), actions)
+
+    analytics = MatchAnalytics(Session(marcotti.connection))
+    lengths = analytics.match_lengths(match_ids)
+    fouls = analytics.foul_profile(match_ids)
+    stoppages = analytics.stoppage_profile(match_ids)
+    assert list(lengths.index) == list(fouls.index) == list(stoppages.index) == sorted(
+        (match_id, period) for match_id in match_ids[:2] for period in [1, 2])
+    for match_id in match_ids[:2]:
+        assert list(lengths.loc[match_id].length.iteritems()) == sorted(analytics.match_length(match_id))
+        for period in [1, 2]:
+            assert fouls.loc[(match_id, period), 'count'] == len(analytics.foul_times(match_id, period))
+            assert fouls.loc[(match_id, period), 'mean_interval'] == \
+                analytics.mean_time_between_fouls(match_id, period)
+            assert stoppages.loc[(match_id, period), 'count'] == \
+                len(analytics.stoppage_times(match_id, period))
+            assert stoppages.loc[(match_id, period), 'mean_interval'] == \
+                analytics.mean_time_between_stoppages(match_id, period)
+
+    analytics.DENORMALIZED_ACTIONS = True
+    assert analytics.stoppage_profile(match_ids).equals(stoppages)
+    assert analytics.foul_profile(MatchAnalytics.season_matches(uuid.uuid4(), 1)).empty
+
+
+def test_effective_play_engine(sqlite_config):
+    Event = namedtuple('Event', ['match', 'period', 'secs', 'action'])
+    sequence = ["Start Period", "Pass", "Pass", "Foul", "Free Kick", "Pass", "Out of Play", "Substitution",
+                "Throw-In", "Pass", "Throw-In", "Shot", "Goal", "Pass", "Match Stoppage", "Pass",
+                "End Period"]
+    times = [0, 5, 9, 20, 30, 30, 41, 45, 60, 64, 64, 70, 71, 90, 95, 100, 110]
+    match_ids = [uuid.uuid4() for _ in range(2)]
+    events = [Event(match_id, period, secs + 3 * period + 11 * match_indx,
+                    enums.ActionType.from_string(action))
+              for match_indx, match_id in enumerate(sorted(match_ids))
+              for period in [1, 2] for indx, (secs, action) in enumerate(zip(times, sequence))
+              if not (match_indx and indx in [7, 12])]
+    frame = pd.DataFrame(events, columns=Event._fields).rename(
+        columns={'match': 'match_id', 'secs': 'period_secs'})
+
+    @coroutine
+    def capture(sent):
+        while True:
+            sent.append((yield))
+
+    intervals, pauses = [], []
+    pipeline = parse_possessions_alt(interval_pipe=capture(intervals), pause_pipe=capture(pauses))
+    for event in events:
+        pipeline.send(event)
+    starts, secs = period_starts(frame), frame.period_secs.values
+    segments = play_segments(starts, secs, play_classes(frame.action.values))
+    assert len(intervals) > 4 and len(pauses) > 4
+    for (start, end), sent in zip(segments, [intervals, pauses]):
+        assert [(events[indx], events[jndx]) for indx, jndx in zip(start, end)] == sent
+
+    effective = effective_play(frame)
+    assert list(effective.index) == [(match_id, period)
+                                     for match_id in sorted(match_ids) for period in [1, 2]]
+    for (match_id, period), secs in effective.effective.iteritems():
+        assert secs == sum(end.secs - start.secs for start, end in intervals
+                           if (start.match, start.period) == (match_id, period))
+
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    event_ids = [uuid.uuid4() for _ in events]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=event.match, period=event.period,
+                 period_secs=event.secs)
+            for event_id, event in zip(event_ids, events)])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event_id, type=event.action, is_success=True, match_id=event.match)
+            for event_id, event in zip(event_ids, events)])
+    analytics = MatchAnalytics(Session(marcotti.connection))
+    assert analytics.effective_times(match_ids).equals(effective)
+    assert analytics.effective_times([uuid.uuid4()]).empty
+
+
+@pytest.mark.parametrize("denormalized", [False, True])
+@pytest.mark.parametrize("stop_first,effective", [(True, 50), (False, 20)])
+def test_effective_time_simultaneous_events(sqlite_config, denormalized, stop_first, effective):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_id = uuid.uuid4()
+    sequence = [(0, "Start Period"), (10, "Pass"), (20, "Throw-In"), (20, "Out of Play"), (40, "Pass"),
+                (50, "End Period")]
+    order = [0, 1, 3, 2, 4, 5] if stop_first else range(len(sequence))
+    event_ids = [uuid.UUID(int=order[indx] + 1) for indx in range(len(sequence))]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mcs.MatchMap.__table__.insert(),
+                                    dict(id=match_id, remote_id='12345', supplier_id=1))
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=match_id, period=1, period_secs=secs)
+            for event_id, (secs, action) in zip(event_ids, sequence)])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event_id, type=enums.ActionType.from_string(action),
+                 is_success=True, match_id=match_id, period=1, period_secs=secs)
+            for event_id, (secs, action) in zip(event_ids, sequence)])
+    analytics = MatchAnalytics(Session(marcotti.connection))
+    analytics.DENORMALIZED_ACTIONS = denormalized
+
+    assert [event.secs for event in analytics.period_events(match_id, 1)] == [0, 10, 20, 20, 40, 50]
+    assert [record.secs for record in analytics.calc_effective_time(match_id, 1)] == [effective]
+    assert list(analytics.effective_times([match_id]).effective) == [effective]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_effective_play_engine_random_periods(seed):
+    Event = namedtuple('Event', ['match', 'period', 'secs', 'action'])
+    rng = random.Random(seed)
+    actions = [enums.ActionType.from_string(action) for action in [
+        "Pass", "Pass", "Dribble", "Shot", "Tackle", "Clearance", "Out of Play", "Foul", "Offside", "Card",
+        "Goal", "Match Stoppage", "Substitution", "Throw-In", "Corner Kick", "Free Kick", "Goal Kick"]]
+    start, end = enums.ActionType.start_period, enums.ActionType.end_period
+
+    events, intervals, pauses = [], [], []
+    for match_id in sorted(uuid.uuid4() for _ in range(3)):
+        for period in [1, 2]:
+            secs, period_events = 0, [Event(match_id, period, 0, start)]
+            for _ in range(rng.randint(0, 60)):
+                secs += rng.choice([0, 0, 1, 2, 5])
+                period_events.append(Event(match_id, period, secs, rng.choice(actions)))
+            period_events.append(Event(match_id, period, secs + rng.choice([0, 3]), end))
+
+            @coroutine
+            def capture(sent):
+                while True:
+                    sent.append((yield))
+
+            pipeline = parse_possessions_alt(interval_pipe=capture(intervals), pause_pipe=capture(pauses))
+            for event in period_events:
+                pipeline.send(event)
+            events.extend(period_events)
+
+    frame = pd.DataFrame(events, columns=Event._fields).rename(
+        columns={'match': 'match_id', 'secs': 'period_secs'})
+    segments = play_segments(period_starts(frame), frame.period_secs.values,
+                             play_classes(frame.action.values))
+    for (start, end), sent in zip(segments, [intervals, pauses]):
+        assert [(events[indx], events[jndx]) for indx, jndx in zip(start, end)] == sent
+
+    effective = effective_play(frame)
+    for (match_id, period), secs in effective.effective.iteritems():
+        assert secs == sum(end.secs - start.secs for start, end in intervals
+                           if (start.match, start.period) == (match_id, period))
+
+
+def test_possession_engine(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_id, home, away = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    sequence = [(1, 0, home, "Start Period"), (1, 5, home, "Pass"), (1, 9, home, "Shot"),
+                (1, 9, None, "Match Stoppage"), (1, 12, away, "Pass"), (1, 20, home, "Foul"),
+                (1, 31, home, "Free Kick"), (1, 45, home, "End Period"),
+                (2, 0, away, "Start Period"), (2, 8, away, "Pass"), (2, 15, away, "Goal")]
+    event_ids = [uuid.uuid4() for _ in sequence]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=match_id, period=period, period_secs=secs,
+                 x=secs, y=50.0)
+            for event_id, (period, secs, team_id, action) in zip(event_ids, sequence)])
+        marcotti.connection.execute(mc.ClubMatchEvents.__table__.insert(), [
+            dict(id=event_id, team_id=team_id) for event_id, (_, _, team_id, _) in zip(event_ids, sequence)])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event_id, type=enums.ActionType.from_string(action),
+                 is_success=True, match_id=match_id)
+            for event_id, (_, _, _, action) in
+            zip(event_ids, sequence) + [(event_ids[2], (1, 9, home, "Shot"))]])
+
+    sink = MemorySink()
+    frame = MatchAnalytics(Session(marcotti.connection)).possessions([match_id], sink)
+    assert list(frame.columns) == list(Possession._fields)
+    assert [(record.period, record.team, record.start, record.end, record.events, record.outcome)
+            for record in sink.records] == [(1, home, 0, 9, 3, "Shot"), (1, away, 12, 12, 1, "Pass"),
+                                            (1, home, 20, 45, 3, "End Period"), (2, away, 0, 15, 3, "Goal")]
+    assert [(record.start_x, record.end_x) for record in sink.records] == \
+        [(0, 9), (12, 12), (20, 45), (0, 15)]
+    assert MatchAnalytics(Session(marcotti.connection)).possessions([uuid.uuid4()]).empty
+
+
+def test_parallel_match_analytics(sqlite_config, tmpdir):
+    sqlite_config.DBNAME = '/' + str(tmpdir.join('analytics.db'))
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_ids = [uuid.uuid4() for _ in range(3)]
+    sequence = ["Start Period", "Pass", "Foul", "Free Kick", "Pass", "End Period"]
+    events = [dict(id=uuid.uuid4(), domain='club', match_id=match_id, period=period,
+                   period_secs=20 * indx + match_indx * (indx == 2))
+              for match_indx, match_id in enumerate(match_ids) for period in [1, 2]
+              for indx in range(len(sequence))]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), events)
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event['id'], is_success=True, match_id=event['match_id'],
+                 type=enums.ActionType.from_string(sequence[indx % len(sequence)]))
+            for indx, event in enumerate(events)])
+    expected = MatchAnalytics(Session(marcotti.connection)).effective_times(match_ids)
+    checkpoint = str(tmpdir.join('checkpoint'))
+
+    runner = ParallelAnalytics(sqlite_config, 'effective_times', processes=2, checkpoint=checkpoint)
+    result = runner.workflow(match_ids[:2])
+    assert result.sort_index().equals(expected.loc[match_ids[:2]].sort_index())
+    assert len(runner.results) == 2 and runner.throughput > 0
+
+    result = runner.workflow(match_ids)
+    assert result.sort_index().equals(expected)
+    assert [analysis.match_id for analysis in runner.results] == match_ids[2:]
+
+    assert sorted(os.listdir(checkpoint)) == sorted('effective_times_{}.pkl'.format(match_id)
+                                                    for match_id in match_ids)
+
+    with pytest.raises(ValueError):
+        ParallelAnalytics(sqlite_config, 'calc_match_lengths', processes=2)
@@ -1,5 +1,6 @@
 # coding=utf-8
 import pytest
+from sqlalchemy import event as sqla_event
 from sqlalchemy.exc import DataError
 
 import marcottievents.models.club as mc
@@ -7,6 +8,7 @@ import marcottievents.models.common.overview as mco
 import marcottievents.models.common.personnel as mcp
 import marcottievents.models.common.events as mce
 import marcottievents.models.common.enums as enums
+from marcottievents.lib.profiles import profile_query
 
 
 club_only = pytest.mark.skipif(
@@ -414,3 +416,46 @@ def test_club_penalty_shootout_opener_insert(session, club_data):
         .filter(mc.ClubPenaltyShootoutOpeners.match_id == match.id).one()
 
     assert unicode(shootout_from_db) == u"<ClubPenaltyShootoutOpener(match={}, team=Arsenal FC)>".format(match.id)
+
+
+@club_only
+def test_club_match_loader_profiles(session, club_data, person_data, position_data):
+    match = mc.ClubLeagueMatches(matchday=15, **club_data)
+    session.add(match)
+    session.flush()
+    lineups = [mc.ClubMatchLineups(match=match, team=match.home_team, position=pos, player=mcp.Players(**plyr))
+               for plyr, pos in zip(person_data['player'], position_data)]
+    session.add_all([mce.MatchActions(event=mc.ClubMatchEvents(match=match, team=match.home_team, period=1,
+                                                               period_secs=60 * indx),
+                                      lineup=lineup, type=enums.ActionType.ball_pass)
+                     for indx, lineup in enumerate(lineups)])
+    session.commit()
+    lineup_sheet = sorted(unicode(lineup) for lineup in lineups)
+
+    def rendered(profile, render):
+        session.expunge_all()
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        sqla_event.listen(session.connection(), 'before_cursor_execute', listener)
+        result = [render(record) for record in profile_query(session, mc.ClubLeagueMatches, profile)]
+        sqla_event.remove(session.connection(), 'before_cursor_execute', listener)
+        return result, len(statements)
+
+    cards, count = rendered('match_card', lambda record: (unicode(record), record.season.name,
+                                                          record.venue.name, record.referee.full_name,
+                                                          record.away_manager.full_name))
+    assert count == 1
+    assert cards == [(u"<ClubLeagueMatch(home=Arsenal FC, away=Lincoln City FC, competition=Test Competition, "
+                      u"matchday=15, date=2015-01-01)>", "2014-2015", u"Emirates Stadium", u"Mark Clattenburg",
+                      u"Gary Simpson")]
+
+    sheets, count = rendered('lineup_sheet', lambda record: sorted(unicode(lineup) for lineup in record.lineups))
+    assert count == 2
+    assert sheets == [lineup_sheet]
+
+    timelines, count = rendered('event_timeline', lambda record: sorted(
+        (evt.period_secs, evt.team.name, action.lineup.full_name, action.modifiers)
+        for evt in record.events for action in evt.actions))
+    assert count == 4
+    assert [(secs, team) for secs, team, _, _ in timelines[0]] == [(0, u"Arsenal FC"), (60, u"Arsenal FC"),
+                                                                   (120, u"Arsenal FC")]
@@ -0,0 +1,549 @@
+# coding=utf-8
+import uuid
+from datetime import date
+
+import pytest
+import numpy as np
+import pandas as pd
+from sqlalchemy import event as sqla_event
+from sqlalchemy.orm.session import Session
+
+from marcottievents import Marcotti
+from marcottievents.models.club import ClubSchema
+import marcottievents.models.club as mc
+import marcottievents.models.common.overview as mco
+import marcottievents.models.common.enums as enums
+import marcottievents.models.common.suppliers as mcs
+import marcottievents.models.common.events as mce
+import marcottievents.models.common.personnel as mcp
+from marcottievents.models import VIEWS, CreateView, DropView
+from marcottievents.etl import ETL, MarcottiLoad, MarcottiTransform, MarcottiEventTransform
+from marcottievents.etl.ecsv import CSVExtractor
+from marcottievents.etl.base import bulk, parallel
+from marcottievents.etl.base.workflows import LookupCache, WorkflowBase
+
+
+club_only = pytest.mark.skipif(
+    pytest.config.getoption("--schema") != "club",
+    reason="Test only valid for club databases"
+)
+
+
+@club_only
+def test_batched_existence_matches_per_row(session):
+    england = mco.Countries(name=u"England", confederation=enums.ConfederationType.europe)
+    session.add_all([mc.Clubs(name=u"Arsenal FC", short_name=u"Arsenal", country=england),
+                     mc.Clubs(name=u"Lincoln City FC", country=england)])
+    session.commit()
+
+    loader = MarcottiLoad(session, None)
+    conditions = [
+        dict(name=u"Arsenal FC", short_name=u"Arsenal", country_id=england.id),
+        dict(name=u"Arsenal FC", short_name=u"Gunners", country_id=england.id),
+        dict(name=u"Lincoln City FC", country_id=england.id),
+        dict(name=u"Lincoln City FC"),
+        dict(name=u"Chelsea FC", country_id=england.id),
+        dict()
+    ]
+    expected = [loader.record_exists(mc.Clubs, **condition) for condition in conditions]
+    assert loader.records_exist(mc.Clubs, conditions) == expected
+    assert expected == [True, False, True, True, False, True]
+
+    session.add_all([mcp.Players(first_name=u"Alex", last_name=u"Iwobi", birth_date=date(1996, 5, 3),
+                                 country=england), mco.Years(yr=2014)])
+    session.commit()
+    birth_dates = pd.Series([date(1996, 5, 3), date(1996, 5, 4)]).astype('datetime64[ns]')
+    conditions = [dict(last_name=u"Iwobi", birth_date=birth_date) for birth_date in birth_dates]
+    conditions.append(dict(last_name=u"Iwobi", birth_date=date(1996, 5, 3)))
+    expected = [loader.record_exists(mcp.Players, **condition) for condition in conditions]
+    assert loader.records_exist(mcp.Players, conditions) == expected
+    assert expected == [True, False, True]
+    assert loader.records_exist(mco.Years, [dict(yr=np.int64(2014)), dict(yr=np.int64(2015))]) == [True, False]
+
+
+@club_only
+def test_batched_existence_club_load(session):
+    england = mco.Countries(name=u"England", confederation=enums.ConfederationType.europe)
+    session.add(mc.Clubs(name=u"Arsenal FC", short_name=u"Arsenal", country=england))
+    session.commit()
+
+    loader = MarcottiLoad(session, None)
+    loader.BATCH_SIZE = 1
+    loader.clubs(pd.DataFrame([
+        dict(remote_id=None, name=u"Arsenal FC", short_name=u"Arsenal", country_id=england.id),
+        dict(remote_id=None, name=u"Lincoln City FC", short_name=u"Lincoln", country_id=england.id),
+        dict(remote_id=None, name=u"Chelsea FC", short_name=u"Chelsea", country_id=england.id)
+    ]))
+
+    assert session.query(mc.Clubs).count() == 3
+    assert session.query(mc.Clubs).filter_by(name=u"Arsenal FC").count() == 1
+
+
+def test_lookup_cache_lru_eviction():
+    cache = LookupCache(maxsize=2)
+    cache.store(mc.Clubs, dict(name=u"Arsenal FC"), 1)
+    cache.store(mc.Clubs, dict(name=u"Lincoln City FC"), 2)
+    assert cache.lookup(mc.Clubs, dict(name=u"Arsenal FC")) == 1
+    cache.store(mc.Clubs, dict(name=u"Chelsea FC"), 3)
+
+    assert cache.lookup(mc.Clubs, dict(name=u"Lincoln City FC")) is None
+    assert cache.lookup(mc.Clubs, dict(name=u"Arsenal FC")) == 1
+    assert cache.lookup(mc.Clubs, dict(name=u"Chelsea FC")) == 3
+    assert cache.stats() == dict(hits=3, misses=1, evictions=1, size=2)
+
+
+@club_only
+def test_lookup_cache_prefetch(session):
+    england = mco.Countries(name=u"England", confederation=enums.ConfederationType.europe)
+    arsenal = mc.Clubs(name=u"Arsenal FC", country=england)
+    session.add_all([arsenal, mc.Clubs(name=u"Lincoln City FC", country=england),
+                     mc.Clubs(name=u"Lincoln City FC", country=england)])
+    session.commit()
+
+    transformer = MarcottiTransform(session, None)
+    transformer.id_cache.clear()
+    assert transformer.prefetch(mc.Clubs, 'name', country_id=england.id) == {(u"Arsenal FC",): arsenal.id}
+
+    session.query(mc.Clubs).filter_by(name=u"Arsenal FC").delete()
+    assert transformer.get_id(mc.Clubs, name=u"Arsenal FC", country_id=england.id) == arsenal.id
+    assert transformer.get_id(mc.Clubs, name=u"Lincoln City FC", country_id=england.id) is None
+
+    session.rollback()
+    assert transformer.id_cache.stats()['size'] == 0
+
+
+def test_id_cache_per_engine(sqlite_config):
+    club_ids = []
+    for club_id in [uuid.uuid4(), uuid.uuid4()]:
+        marcotti = Marcotti(sqlite_config)
+        marcotti.create_db(ClubSchema)
+        with marcotti.create_session() as sess:
+            england = mco.Countries(name=u"England", confederation=enums.ConfederationType.europe)
+            sess.add(mc.Clubs(id=club_id, name=u"Arsenal FC", country=england))
+            sess.commit()
+            assert WorkflowBase(sess, None).get_id(mc.Clubs, name=u"Arsenal FC") == club_id
+        club_ids.append((marcotti, club_id))
+
+    for marcotti, club_id in club_ids:
+        with marcotti.create_session() as sess:
+            assert WorkflowBase(sess, None).get_id(mc.Clubs, name=u"Arsenal FC") == club_id
+
+
+def test_id_cache_cleared_on_connection_rollback(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    connection = marcotti.engine.connect()
+    transaction = connection.begin()
+    sess = Session(bind=connection)
+    sess.add(mc.Clubs(name=u"Arsenal FC", country=mco.Countries(
+        name=u"England", confederation=enums.ConfederationType.europe)))
+    sess.flush()
+    workflow = WorkflowBase(sess, None)
+    assert workflow.get_id(mc.Clubs, name=u"Arsenal FC") is not None
+    assert workflow.id_cache.stats()['size'] == 1
+
+    transaction.rollback()
+    assert workflow.id_cache.stats()['size'] == 0
+    assert workflow.get_id(mc.Clubs, name=u"Arsenal FC") is None
+    sess.close()
+    connection.close()
+
+
+def test_season_labels(session):
+    years = {yr: mco.Years(yr=yr) for yr in [2014, 2015]}
+    seasons = [mco.Seasons(start_year=years[2014], end_year=years[2014]),
+               mco.Seasons(start_year=years[2014], end_year=years[2015])]
+    session.add_all(seasons)
+    session.commit()
+
+    season_ids = [season.id for season in seasons]
+
+    transformer = MarcottiTransform(session, None)
+    assert transformer.load_seasons() == 2
+
+    statements = []
+    connection = session.connection()
+    listener = lambda *args: statements.append(args[2])
+    sqla_event.listen(connection, 'before_cursor_execute', listener)
+    try:
+        assert transformer.get_season_id(2014) == season_ids[0]
+        assert transformer.get_season_id(u"2014-2015") == season_ids[1]
+        assert statements == []
+
+        new_season = mco.Seasons(start_year=years[2015], end_year=years[2015])
+        session.add(new_season)
+        assert transformer.get_season_id("2015") == new_season.id
+        assert transformer.get_season_id("2015-2016") is None
+        del statements[:]
+        assert transformer.get_season_id("2015-2016") is None
+        assert statements == []
+    finally:
+        sqla_event.remove(connection, 'before_cursor_execute', listener)
+
+
+@club_only
+def test_event_transform_maps_remote_ids(session, club_data):
+    match = mc.ClubLeagueMatches(matchday=15, **club_data)
+    supplier = mcs.Suppliers(name=u"Test")
+    session.add_all([match, supplier])
+    session.commit()
+    session.add_all([mcs.MatchMap(id=match.id, remote_id="1001", supplier_id=supplier.id),
+                     mc.ClubMap(id=match.home_team_id, remote_id="10", supplier_id=supplier.id),
+                     mc.ClubMap(id=match.away_team_id, remote_id="20", supplier_id=supplier.id)])
+    session.commit()
+
+    transformer = MarcottiEventTransform(session, u"Test")
+    data_frame = pd.DataFrame([
+        dict(remote_id="1", remote_match_id="1001", remote_team_id="20", period=1),
+        dict(remote_id="2", remote_match_id="1001", remote_team_id="30", period=1),
+        dict(remote_id="3", remote_match_id="1002", remote_team_id=None, period=2)
+    ])
+    events = transformer.events(data_frame)
+
+    assert list(events.columns) == ['period', 'remote_id', 'match_id', 'team_id']
+    assert list(events.match_id) == [match.id, match.id, None]
+    assert list(events.team_id) == [match.away_team_id, None, None]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sqla_event.listen(session.connection(), 'before_cursor_execute', listener)
+    try:
+        assert transformer.events(data_frame).equals(events)
+    finally:
+        sqla_event.remove(session.connection(), 'before_cursor_execute', listener)
+    assert len(statements) == 2
+
+
+@club_only
+@pytest.mark.parametrize("copy", [True, False])
+def test_bulk_insert_joined_events(session, club_data, copy):
+    match = mc.ClubLeagueMatches(matchday=15, **club_data)
+    session.add(match)
+    session.commit()
+
+    event_id = uuid.uuid4()
+    bulk.bulk_insert(session, mc.ClubMatchEvents, [
+        dict(id=event_id, timestamp=u"2015-01-01T19:45:00", period=1, period_secs=900, x=45.5, y=None,
+             match_id=match.id, team_id=match.home_team_id),
+        dict(period=2, period_secs=120, x=10.0, y=20.0, match_id=match.id, team_id=match.away_team_id)
+    ], copy=copy)
+    bulk.bulk_insert(session, mce.MatchActions, [
+        dict(event_id=event_id, type=enums.ActionType.from_string("Pass"), x_end=50.0, y_end=60.0,
+             match_id=match.id)
+    ], copy=copy)
+    session.commit()
+
+    event = session.query(mc.ClubMatchEvents).get(event_id)
+    assert event.domain == 'club'
+    assert (event.period, event.period_secs, event.x, event.y) == (1, 900, 45.5, None)
+    assert event.team_id == match.home_team_id
+    assert session.query(mce.MatchEvents).filter_by(match_id=match.id).count() == 2
+
+    action = session.query(mce.MatchActions).one()
+    assert action.event_id == event_id
+    assert action.type == enums.ActionType.from_string("Pass")
+    assert action.is_success is True
+
+
+def test_streaming_csv_extractor(tmpdir):
+    tmpdir.join("clubs.csv").write("ID,Name,Short Name,Country\n"
+                                   "1,Arsenal FC,Arsenal,England\n"
+                                   "2,Lincoln City FC,,England\n")
+
+    records = CSVExtractor(str(tmpdir), streaming=True).clubs(["clubs.csv"])
+    assert not isinstance(records, list)
+    assert list(records) == CSVExtractor(str(tmpdir)).clubs(["clubs.csv"])
+
+
+@club_only
+def test_chunked_workflow(session):
+    session.add(mco.Countries(name=u"England", confederation=enums.ConfederationType.europe))
+    session.commit()
+
+    clubs = (dict(remote_id=None, name=name, short_name=None, country=u"England")
+             for name in [u"Arsenal FC", u"Lincoln City FC", u"Chelsea FC", u"Arsenal FC", u"Everton FC"])
+    ETL(transform=MarcottiTransform, load=MarcottiLoad, session=session).workflow('clubs', clubs, chunksize=2)
+
+    assert session.query(mc.Clubs).count() == 4
+
+
+def test_partition_by_match():
+    records = [dict(remote_id="1", remote_match_id="m1"), dict(remote_id="2", remote_match_id="m2"),
+               dict(remote_id="3", remote_match_id="m1")]
+    groups = parallel.partition(records)
+    assert list(groups.keys()) == ["m1", "m2"]
+    assert [rec['remote_id'] for rec in groups["m1"]] == ["1", "3"]
+
+
+@club_only
+def test_load_match_reports_failure(session, club_data):
+    match = mc.ClubLeagueMatches(matchday=15, **club_data)
+    supplier = mcs.Suppliers(name=u"Test")
+    session.add_all([match, supplier])
+    session.commit()
+    session.add(mcs.MatchMap(id=match.id, remote_id="1001", supplier_id=supplier.id))
+    session.commit()
+
+    events = [dict(remote_id="1", remote_match_id="1001", remote_team_id=None, period=1, period_secs=0)]
+    result = parallel.load_match(session, MarcottiEventTransform, MarcottiLoad, u"Test", "1001",
+                                 [('events', events)])
+    assert result.error is None
+    assert result.records == 1
+    assert session.query(mce.MatchEvents).filter_by(match_id=match.id).count() == 1
+
+    result = parallel.load_match(session, MarcottiEventTransform, MarcottiLoad, u"Test", "1001",
+                                 [('matches_played', events)])
+    assert result.remote_match_id == "1001"
+    assert result.error.startswith("AttributeError")
+
+
+def test_load_match_rolls_back_partial_match(sqlite_config, club_data):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    session = Session(marcotti.connection)
+    match = mc.ClubLeagueMatches(matchday=15, **club_data)
+    supplier = mcs.Suppliers(id=1, name=u"Test")
+    session.add_all([match, supplier])
+    session.commit()
+    session.add(mcs.MatchMap(id=match.id, remote_id="1001", supplier_id=supplier.id))
+    session.commit()
+    match_id = match.id
+
+    events = [dict(remote_id="1", remote_match_id="1001", remote_team_id=None, period=1, period_secs=0)]
+    actions = [dict(remote_id="1", period=1)]
+    result = parallel.load_match(session, MarcottiEventTransform, MarcottiLoad, u"Test", "1001",
+                                 [('events', events), ('actions', actions)])
+    assert result.error.startswith("KeyError")
+    assert session.query(mce.MatchEvents).filter_by(match_id=match_id).count() == 0
+    assert session.query(mcs.MatchEventMap).filter_by(remote_id="1").count() == 0
+    assert session.query(mcs.MatchMap).filter_by(remote_id="1001").count() == 1
+
+
+@club_only
+def test_actions_resolve_lineups_across_matches(session, club_data, modifiers):
+    player = mcp.Players(first_name=u"Alex", last_name=u"Iwobi", birth_date=date(1996, 5, 3),
+                         country=club_data['home_team'].country)
+    matches = [mc.ClubLeagueMatches(matchday=matchday, **club_data) for matchday in (15, 16)]
+    session.add_all(matches)
+    session.commit()
+    lineups = [mc.ClubMatchLineups(match_id=match.id, team_id=match.home_team_id, player=player)
+               for match in matches]
+    events = [mc.ClubMatchEvents(match_id=match.id, team_id=match.home_team_id, period=1, period_secs=secs)
+              for match in matches for secs in (60, 120)]
+    head = mce.Modifiers(type=enums.ModifierType.from_string("Head"),
+                         category=enums.ModifierCategoryType.from_string("Body Part"))
+    session.add_all(lineups + events + [head])
+    session.commit()
+
+    loader = MarcottiLoad(session, None)
+    action_frame = pd.DataFrame([
+        dict(event_id=evt.id, type=enums.ActionType.from_string("Pass"), match_id=evt.match_id,
+             player_id=player.id, is_success=True, modifier_type="Head" if evt.period_secs == 60 else None)
+        for evt in events])
+    assert loader.views == []
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sqla_event.listen(session.connection(), 'before_cursor_execute', listener)
+    loader.actions(action_frame)
+    sqla_event.remove(session.connection(), 'before_cursor_execute', listener)
+
+    actions = session.query(mce.MatchActions).all()
+    assert len(actions) == 4
+    assert all(action.lineup.match_id == action.event.match_id for action in actions)
+    assert all((action.match_id, action.team_id, action.period, action.period_secs) ==
+               (action.event.match_id, action.event.team_id, action.event.period, action.event.period_secs)
+               for action in actions)
+    assert session.query(mce.MatchActionModifiers).filter(
+        mce.MatchActionModifiers.modifier_id != None).count() == 2
+    assert len([stmt for stmt in statements if stmt.lstrip().upper().startswith('SELECT')]) == 3
+
+
+@club_only
+def test_actions_missing_lineups(session, club_data):
+    players = [mcp.Players(first_name=u"Alex", last_name=last_name, birth_date=date(1996, 5, 3),
+                           country=club_data['home_team'].country) for last_name in [u"Iwobi", u"Nelson"]]
+    match = mc.ClubLeagueMatches(matchday=15, **club_data)
+    session.add(match)
+    session.commit()
+    events = [mc.ClubMatchEvents(match_id=match.id, team_id=match.home_team_id, period=1, period_secs=secs)
+              for secs in (60, 120, 180)]
+    session.add_all(events + [mc.ClubMatchLineups(match_id=match.id, team_id=match.home_team_id,
+                                                  player=players[0])])
+    session.commit()
+
+    loader = MarcottiLoad(session, None)
+    action_frame = pd.DataFrame([
+        dict(event_id=evt.id, type=enums.ActionType.from_string("Pass"), match_id=match.id,
+             player_id=player.id, is_success=True)
+        for evt, player in zip(events, [players[0], players[1], players[1]])])
+    with pytest.raises(ValueError) as excinfo:
+        loader.actions(action_frame)
+    assert "No lineup records of 1 players" in str(excinfo.value)
+    assert "player {} in match {}".format(players[1].id, match.id) in str(excinfo.value)
+    assert session.query(mce.MatchActions).count() == 0
+
+
+@club_only
+def test_partitioned_schema_load(db_connection, club_data):
+    transaction = db_connection.begin()
+    try:
+        db_connection.execute("CREATE SCHEMA partitioned")
+        db_connection.execute("SET LOCAL search_path TO partitioned")
+        ClubSchema.metadata.info['partitions'] = 4
+        try:
+            ClubSchema.metadata.create_all(db_connection)
+        finally:
+            del ClubSchema.metadata.info['partitions']
+
+        sess = Session(bind=db_connection)
+        match = mc.ClubLeagueMatches(matchday=15, **club_data)
+        player = mcp.Players(first_name=u"Alex", last_name=u"Iwobi", birth_date=date(1996, 5, 3),
+                             country=club_data['home_team'].country)
+        sess.add_all([match, mcs.Suppliers(name=u"Test")])
+        sess.commit()
+        sess.add(mc.ClubMatchLineups(match_id=match.id, team_id=match.home_team_id, player=player))
+        sess.commit()
+
+        loader = MarcottiLoad(sess, u"Test")
+        with pytest.raises(ValueError) as excinfo:
+            loader.events(pd.DataFrame([dict(remote_id="1", match_id=None, period=1, period_secs=0)]))
+        assert "No match IDs of 1 events: 1" in str(excinfo.value)
+        loader.events(pd.DataFrame([
+            dict(remote_id=str(secs), match_id=match.id, team_id=match.home_team_id, period=1, period_secs=secs)
+            for secs in range(0, 600, 60)]))
+        events = sess.query(mc.ClubMatchEvents).order_by(mc.ClubMatchEvents.period_secs).all()
+        loader.actions(pd.DataFrame([
+            dict(event_id=evt.id, type=enums.ActionType.from_string("Pass"), match_id=match.id,
+                 player_id=player.id, is_success=True) for evt in events]))
+
+        assert len(events) == 10
+        assert sess.query(mcs.MatchEventMap).count() == 10
+        actions = sess.query(mce.MatchActions).all()
+        assert len(actions) == 10
+        assert all(action.lineup.player_id == player.id and action.match_id == match.id for action in actions)
+        assert sum(db_connection.execute("SELECT count(*) FROM match_actions_p{}".format(remainder)).scalar()
+                   for remainder in range(4)) == 10
+        sess.close()
+    finally:
+        transaction.rollback()
+
+
+@club_only
+def test_actions_refresh_materialized_views(session, club_data):
+    session.execute(DropView('club_goals_view'))
+    session.execute(CreateView('club_goals_view', VIEWS['club_goals_view'][1], materialized=True))
+    matches = [mc.ClubLeagueMatches(matchday=matchday, **club_data) for matchday in (15, 16)]
+    session.add_all(matches)
+    session.commit()
+    events = [mc.ClubMatchEvents(match_id=match.id, team_id=match.home_team_id, period=1, period_secs=secs)
+              for match in matches for secs in (60, 120)]
+    session.add_all(events)
+    session.commit()
+
+    loader = MarcottiLoad(session, None)
+    assert loader.views == ['club_goals_view']
+    loader.actions(pd.DataFrame([
+        dict(event_id=evt.id, match_id=evt.match_id, is_success=True,
+             type=enums.ActionType.from_string("Goal" if evt.period_secs == 60 else "Pass"))
+        for evt in events[:2]]))
+    assert [(goal.match_id, goal.period_secs) for goal in session.query(mc.ClubGoals)] == \
+        [(matches[0].id, 60)]
+
+    session.add(mce.MatchActions(event_id=events[2].id, match_id=events[2].match_id,
+                                 type=enums.ActionType.from_string("Goal")))
+    session.query(mce.MatchActions).filter_by(event_id=events[0].id).update(
+        {mce.MatchActions.type: enums.ActionType.from_string("Pass")})
+    loader.refresh_views([matches[1].id])
+    assert session.query(mc.ClubGoals).count() == 2
+    loader.refresh_views([matches[0].id])
+    assert [goal.match_id for goal in session.query(mc.ClubGoals)] == [matches[1].id]
+
+
+def test_insert_ignore_compiles_per_dialect():
+    from sqlalchemy.dialects import postgresql, sqlite, mysql
+
+    statement = bulk.InsertIgnore(mc.ClubMap.__table__)
+    assert str(statement.compile(dialect=postgresql.dialect())).endswith("ON CONFLICT DO NOTHING")
+    assert str(statement.compile(dialect=sqlite.dialect())).startswith("INSERT OR IGNORE INTO club_mapper")
+    assert str(statement.compile(dialect=mysql.dialect())).startswith("INSERT IGNORE INTO club_mapper")
+
+
+@club_only
+@pytest.mark.parametrize("native", [True, False])
+def test_insert_maps_idempotent(session, monkeypatch, native):
+    if not native:
+        monkeypatch.setattr(bulk, 'supports_insert_ignore', lambda dialect: False)
+    england = mco.Countries(name=u"England", confederation=enums.ConfederationType.europe)
+    arsenal = mc.Clubs(name=u"Arsenal FC", country=england)
+    lincoln = mc.Clubs(name=u"Lincoln City FC", country=england)
+    supplier = mcs.Suppliers(name=u"Test")
+    session.add_all([arsenal, lincoln, supplier])
+    session.commit()
+
+    loader = MarcottiLoad(session, u"Test")
+    loader.insert_maps(mc.ClubMap, [dict(id=arsenal.id, remote_id="10", supplier_id=supplier.id)])
+    loader.insert_maps(mc.ClubMap, [dict(id=arsenal.id, remote_id="10", supplier_id=supplier.id),
+                                    dict(id=lincoln.id, remote_id="20", supplier_id=supplier.id),
+                                    dict(id=lincoln.id, remote_id="20", supplier_id=supplier.id)])
+    session.commit()
+
+    assert sorted(rec.remote_id for rec in session.query(mc.ClubMap)) == ["10", "20"]
+
+
+@club_only
+@pytest.mark.parametrize("native", [True, False])
+def test_insert_maps_deletes_orphans(session, monkeypatch, native):
+    if not native:
+        monkeypatch.setattr(bulk, 'supports_insert_ignore', lambda dialect: False)
+    england = mco.Countries(name=u"England", confederation=enums.ConfederationType.europe)
+    arsenal = mc.Clubs(name=u"Arsenal FC", country=england)
+    highbury = mco.Venues(name=u"Highbury", city=u"London", country=england)
+    supplier = mcs.Suppliers(name=u"Test")
+    session.add_all([arsenal, highbury, supplier])
+    session.commit()
+    session.add_all([mc.ClubMap(id=arsenal.id, remote_id="10", supplier_id=supplier.id),
+                     mcs.VenueMap(id=highbury.id, remote_id="100", supplier_id=supplier.id)])
+    session.commit()
+
+    loader = MarcottiLoad(session, u"Test")
+    loader.clubs(pd.DataFrame([dict(name=u"Arsenal", short_name=None, country_id=england.id, remote_id="10"),
+                               dict(name=u"Lincoln City FC", short_name=None, country_id=england.id,
+                                    remote_id="20"),
+                               dict(name=u"Lincoln City", short_name=None, country_id=england.id,
+                                    remote_id="20")]))
+    assert sorted(rec.name for rec in session.query(mc.Clubs)) == [u"Arsenal FC", u"Lincoln City FC"]
+    assert {rec.remote_id: rec.id for rec in session.query(mc.ClubMap)} == {
+        "10": arsenal.id, "20": session.query(mc.Clubs).filter_by(name=u"Lincoln City FC").one().id}
+
+    venue_fields = dict(city=u"London", region=None, latitude=None, longitude=None, altitude=None,
+                        country_id=england.id, timezone_id=None, eff_date=None, length=None, width=None,
+                        capacity=None, seats=None, surface_id=None)
+    loader.venues(pd.DataFrame([dict(name=u"Arsenal Stadium", remote_id="100", **venue_fields)]))
+    assert [rec.name for rec in session.query(mco.Venues)] == [u"Highbury"]
+    assert session.query(mco.VenueHistory).count() == 0
+
+
+@pytest.mark.parametrize("entity", ['events', 'actions'])
+def test_iter_records_matches_iterrows(entity):
+    nrows = 200
+    match_id, team_id = uuid.uuid4(), uuid.uuid4()
+    if entity == 'events':
+        fields = ['timestamp', 'period', 'period_secs', 'x', 'y', 'match_id', 'team_id', 'remote_id']
+        frame = pd.DataFrame([dict(remote_id=str(indx), timestamp=None, period=1 + indx % 2, period_secs=indx,
+                                   x=0.1 * (indx % 1000), y=50.0, match_id=match_id,
+                                   team_id=team_id if indx % 10 else None) for indx in range(nrows)])
+    else:
+        fields = ['event_id', 'type', 'x_end', 'y_end', 'z_end', 'is_success', 'match_id', 'player_id',
+                  'modifier_type']
+        frame = pd.DataFrame([dict(event_id=uuid.uuid4(), type=enums.ActionType.from_string("Pass"),
+                                   x_end=None, y_end=None, z_end=None, is_success=bool(indx % 3),
+                                   match_id=match_id, player_id=uuid.uuid4(),
+                                   modifier_type="Head" if indx % 4 else None) for indx in range(nrows)])
+
+    def row_keys(rows):
+        return [tuple((field, row[field]) for field in fields if field in row and row[field] is not None)
+                for row in rows]
+
+    assert row_keys(MarcottiLoad.iter_records(frame, fields)) == row_keys(row for _, row in frame.iterrows())
+    assert list(MarcottiLoad.iter_records(frame, fields + ['missing']))[0].keys() == \
+        list(MarcottiLoad.iter_records(frame, fields))[0].keys()
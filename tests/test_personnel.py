@@ -97,6 +97,28 @@ def test_person_age_query(session, person_data):
     assert son_hm.exact_age(reference_date) == (22, 358)
 
 
+def test_person_stored_full_name(session, person_data):
+    """Person 009: Verify stored full name matches full name on insert and update."""
+    persons = [mcp.Persons(**data) for key, records in person_data.items()
+               for data in records if key in ['player', 'manager', 'referee']]
+    session.add_all(persons)
+    session.flush()
+
+    for person in session.query(mcp.Persons):
+        assert person.stored_full_name == person.full_name
+    assert session.query(mcp.Persons).filter_by(stored_full_name=u"Son Heung-Min").count() == 1
+
+    person = session.query(mcp.Persons).filter_by(stored_full_name=u"Cristiano Ronaldo").one()
+    person.nick_name = None
+    session.flush()
+    assert session.query(mcp.Persons.stored_full_name).filter_by(person_id=person.person_id).scalar() == \
+        u"Cristiano Aveiro"
+    person.known_first_name = u"Cris"
+    session.flush()
+    assert session.query(mcp.Persons.stored_full_name).filter_by(person_id=person.person_id).scalar() == \
+        u"Cris Aveiro"
+
+
 def test_position_insert(session):
     """Positions 001: Insert generic data into Positions model and verify data."""
     left_fb = mcp.Positions(name=u"Left full-back", type=enums.PositionType.defender)
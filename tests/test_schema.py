@@ -0,0 +1,188 @@
+# coding=utf-8
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, func, MetaData, Table, Column, ForeignKey, String
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.schema import CreateTable
+
+from marcottievents import Marcotti
+from marcottievents.models import GUID, convert_guids, materialized_views, VIEWS
+from marcottievents.models.club import ClubSchema
+import marcottievents.models.club as mc
+from marcottievents.models.national import NatlSchema
+import marcottievents.models.common.enums as enums
+import marcottievents.models.common.events as mce
+import marcottievents.models.common.suppliers as mcs
+
+
+@pytest.fixture
+def sqlite_guid_tables():
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    parent = Table('parents', metadata, Column('id', GUID, primary_key=True), Column('name', String))
+    child = Table('children', metadata, Column('id', GUID, primary_key=True),
+                  Column('parent_id', GUID, ForeignKey('parents.id')))
+    metadata.create_all(engine)
+    return engine, metadata, parent, child
+
+
+def test_guid_storage_type():
+    assert str(GUID().load_dialect_impl(sqlite.dialect()).compile(dialect=sqlite.dialect())) == "BINARY(16)"
+    assert str(GUID().load_dialect_impl(postgresql.dialect()).compile(dialect=postgresql.dialect())) == "UUID"
+
+
+def test_guid_bind_formats():
+    value = uuid.uuid4()
+    guid, dialect = GUID(), sqlite.dialect()
+    for representation in [value, value.bytes, value.hex, str(value), unicode(value), value.int]:
+        assert guid.process_bind_param(representation, dialect) == value.bytes
+    assert GUID.to_uuid(value.hex + '\x00' * 4) == value
+    assert GUID.to_uuid(uuid.UUID(int=1).bytes) == uuid.UUID(int=1)
+    assert guid.process_bind_param(value, postgresql.dialect()) == value.hex
+
+
+def test_guid_sqlite_round_trip(sqlite_guid_tables):
+    engine, metadata, parent, child = sqlite_guid_tables
+    parent_id, child_id = uuid.uuid4(), uuid.uuid4()
+    engine.execute(parent.insert(), id=parent_id, name=u"Parent")
+    engine.execute(child.insert(), id=child_id, parent_id=parent_id)
+
+    record = engine.execute(select([child, parent], use_labels=True).select_from(child.join(parent))).first()
+    assert record[child.c.id] == child_id
+    assert record[parent.c.id] == parent_id
+    assert engine.execute(parent.select().where(parent.c.id == parent_id)).first().name == u"Parent"
+
+
+def test_convert_legacy_guids(sqlite_guid_tables):
+    engine, metadata, parent, child = sqlite_guid_tables
+    parent_id, child_id = uuid.uuid4(), uuid.uuid4()
+    engine.execute("INSERT INTO parents (id, name) VALUES (?, ?)", parent_id.hex, u"Parent")
+    engine.execute("INSERT INTO children (id, parent_id) VALUES (?, ?)", child_id.hex, parent_id.hex)
+
+    with engine.connect() as connection:
+        assert convert_guids(connection, metadata) == 3
+        assert convert_guids(connection, metadata) == 0
+
+    assert [len(value) for value in engine.execute("SELECT id, parent_id FROM children").first()] == [16, 16]
+    record = engine.execute(select([child, parent], use_labels=True).select_from(child.join(parent))).first()
+    assert (record[child.c.id], record[parent.c.id]) == (child_id, parent_id)
+
+
+def test_mapper_indexes_cover_transform_lookups(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    assert marcotti.check_indexes() == []
+
+    marcotti.connection.execute("DROP INDEX match_mapper_indx")
+    assert marcotti.check_indexes() == [(mcs.MatchMap, ('supplier_id', 'remote_id'))]
+
+    marcotti.create_indexes(ClubSchema)
+    assert marcotti.check_indexes() == []
+    index = [indx for indx in inspect(marcotti.connection).get_indexes('match_mapper')
+             if indx['name'] == 'match_mapper_indx'][0]
+    assert index['column_names'] == ['supplier_id', 'remote_id'] and index['unique']
+
+
+MODEL_INDEXES = {
+    'match_events': ('match_events_indx', ['match_id', 'period', 'period_secs']),
+    'match_actions': ('match_actions_indx', ['event_id', 'type']),
+    'lineups': ('lineups_indx', ['match_id', 'player_id', 'position_id']),
+    'matches': ('match_indx', ['match_date', 'competition_id', 'season_id']),
+    'persons': ('persons_indx', ['first_name', 'middle_name', 'last_name', 'nick_name']),
+    'club_league_matches': ('club_league_indx', ['matchday', 'home_team_id', 'away_team_id']),
+    'natl_knockout_matches': ('natl_knockout_indx', ['ko_round', 'matchday', 'home_team_id', 'away_team_id'])
+}
+
+
+def created_indexes(connection):
+    inspector = inspect(connection)
+    return {table: [(index['name'], index['column_names']) for index in inspector.get_indexes(table)]
+            for table in MODEL_INDEXES}
+
+
+def test_model_indexes_created_sqlite(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(NatlSchema)
+    indexes = created_indexes(marcotti.connection)
+    for table, index in MODEL_INDEXES.items():
+        assert index in indexes[table]
+
+
+def test_model_indexes_created(session):
+    indexes = created_indexes(session.connection())
+    for table, index in MODEL_INDEXES.items():
+        assert index in indexes[table]
+
+
+def test_materialized_views_sqlite(sqlite_config):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema, materialized_views=True)
+    marcotti.create_db(ClubSchema)
+    inspector = inspect(marcotti.connection)
+    assert materialized_views(marcotti.connection) == list(VIEWS)
+    assert 'club_goals_view' in VIEWS
+    assert inspector.get_view_names() == []
+    assert [index['column_names'] for index in inspector.get_indexes('club_goals_view')] == [['match_id']]
+
+    marcotti.refresh_views()
+    ClubSchema.metadata.drop_all(marcotti.connection)
+    assert inspect(marcotti.connection).get_table_names() == []
+
+
+def test_action_indexes(sqlite_config):
+    nactions = 2000
+    sqlite_config.ACTION_INDEXES = ['Goal', 'End Period']
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    indexes = {index['name'] for index in inspect(marcotti.connection).get_indexes('match_actions')}
+    assert {'match_actions_goal_indx', 'match_actions_end_period_indx'} <= indexes
+
+    match_id, team_id = uuid.uuid4(), uuid.uuid4()
+    event_ids = [uuid.uuid4() for _ in range(nactions)]
+    types = ['Pass', 'Pass', 'Pass', 'Tackle', 'Shot', 'Foul', 'Throw-In', 'Clearance']
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=match_id, period=1, period_secs=indx)
+            for indx, event_id in enumerate(event_ids)])
+        marcotti.connection.execute(mc.ClubMatchEvents.__table__.insert(), [
+            dict(id=event_id, team_id=team_id) for event_id in event_ids])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event_id, match_id=match_id,
+                 type=enums.ActionType.from_string("Goal" if indx % 1000 == 0 else types[indx % len(types)]))
+            for indx, event_id in enumerate(event_ids)])
+
+    query = select([func.count()]).select_from(mc.ClubGoals.__table__)
+
+    def plan():
+        return " ".join(str(row.values()[-1]) for row in marcotti.connection.execute(
+            "EXPLAIN QUERY PLAN {}".format(query.compile(dialect=marcotti.engine.dialect))))
+
+    assert 'match_actions_goal_indx' in plan()
+    assert marcotti.connection.execute(query).scalar() == nactions / 1000
+    marcotti.connection.execute("DROP INDEX match_actions_goal_indx")
+    assert 'match_actions_goal_indx' not in plan()
+    assert marcotti.connection.execute(query).scalar() == nactions / 1000
+
+
+def test_partitioned_tables_ddl():
+    def ddl(model):
+        return str(CreateTable(model.__table__).compile(dialect=postgresql.dialect()))
+
+    unpartitioned = ddl(mce.MatchEvents)
+    ClubSchema.metadata.info['partitions'] = 4
+    try:
+        events, actions, club_events, modifiers = [ddl(model) for model in [
+            mce.MatchEvents, mce.MatchActions, mc.ClubMatchEvents, mce.MatchActionModifiers]]
+    finally:
+        del ClubSchema.metadata.info['partitions']
+
+    assert "PARTITION BY" not in unpartitioned
+    assert "PRIMARY KEY (id, match_id)" in events
+    assert events.rstrip().endswith("PARTITION BY HASH (match_id)")
+    assert "PRIMARY KEY (id, match_id)" in actions
+    assert actions.rstrip().endswith("PARTITION BY HASH (match_id)")
+    assert "REFERENCES matches" in events
+    assert "FOREIGN KEY(event_id, match_id) REFERENCES match_events (id, match_id)" in actions
+    assert "REFERENCES clubs" in club_events and "REFERENCES match_events" not in club_events
+    assert "REFERENCES modifiers" in modifiers and "REFERENCES match_actions" not in modifiers
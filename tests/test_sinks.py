@@ -0,0 +1,99 @@
+# coding=utf-8
+import csv
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String
+from sqlalchemy.orm.session import Session
+
+from marcottievents import Marcotti
+from marcottievents.lib.match import MatchAnalytics, EffectiveTime
+from marcottievents.lib.sinks import MemorySink, DataFrameSink, CSVSink, ParquetSink, TableSink
+from marcottievents.models.club import ClubSchema
+import marcottievents.models.common.enums as enums
+import marcottievents.models.common.events as mce
+import marcottievents.models.common.suppliers as mcs
+
+
+RECORDS = [EffectiveTime('m{}'.format(indx // 2), indx % 2 + 1, 60 * indx) for indx in range(5)]
+
+
+def test_memory_sinks():
+    sink = MemorySink()
+    for record in RECORDS:
+        sink.write(record)
+    assert sink.records == RECORDS
+
+    sink = DataFrameSink(columns=EffectiveTime._fields)
+    assert list(sink.frame().columns) == list(EffectiveTime._fields)
+    for record in RECORDS:
+        sink.write(record)
+    frame = sink.frame()
+    assert list(frame.columns) == list(EffectiveTime._fields)
+    assert list(frame.secs) == [record.secs for record in RECORDS]
+
+
+def test_file_sinks(tmpdir):
+    path = str(tmpdir.join('effective.csv'))
+    with CSVSink(path, batch_size=2) as sink:
+        for record in RECORDS[:3]:
+            sink.write(record)
+        assert not sink.handle.closed
+        for record in RECORDS[3:]:
+            sink.write(record)
+    with open(path) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(EffectiveTime._fields)
+    assert rows[1:] == [[str(value) for value in record] for record in RECORDS]
+
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmpdir.join('effective.parquet'))
+    with ParquetSink(path, batch_size=2) as sink:
+        for record in RECORDS:
+            sink.write(record)
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.num_row_groups == 3
+    assert list(parquet_file.read().to_pandas().itertuples(index=False)) == RECORDS
+
+
+def test_table_sink():
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    table = Table('effective', metadata, Column('match', String), Column('period', Integer),
+                  Column('secs', Integer))
+    metadata.create_all(engine)
+    connection = engine.connect()
+    with TableSink(connection, table, batch_size=2) as sink:
+        for record in RECORDS:
+            sink.write(record)
+    assert [tuple(row) for row in connection.execute(table.select())] == RECORDS
+
+
+def test_effective_time_sinks(sqlite_config, tmpdir):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_id = uuid.uuid4()
+    sequence = [("Start Period", 0), ("Pass", 10), ("Foul", 25), ("Substitution", 40), ("Free Kick", 60),
+                ("Pass", 75), ("End Period", 90)]
+    event_ids = [uuid.uuid4() for _ in sequence]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mcs.MatchMap.__table__.insert(),
+                                    dict(id=match_id, remote_id='12345', supplier_id=1))
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=match_id, period=1, period_secs=secs)
+            for event_id, (action, secs) in zip(event_ids, sequence)])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=uuid.uuid4(), event_id=event_id, type=enums.ActionType.from_string(action),
+                 is_success=True, match_id=match_id)
+            for event_id, (action, secs) in zip(event_ids, sequence)])
+    analytics = MatchAnalytics(Session(marcotti.connection))
+
+    path = str(tmpdir.join('effective.csv'))
+    with CSVSink(path) as sink:
+        assert analytics.calc_effective_time(match_id, 1, sink) == [EffectiveTime('12345', 1, 55)]
+        assert analytics.calc_effective_time(match_id, 2, sink) == []
+    with open(path) as f:
+        assert list(csv.reader(f)) == [['match', 'period', 'secs'], ['12345', '1', '55']]
+
+    pauses = analytics.calc_match_pauses(match_id, 1)
+    assert [(pause.start, pause.end, pause.action) for pause in pauses] == [(40, 60, "Substitution")]
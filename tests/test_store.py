@@ -0,0 +1,71 @@
+# coding=utf-8
+import uuid
+
+import pytest
+
+from marcottievents import Marcotti
+from marcottievents.models.club import ClubSchema
+import marcottievents.models.club as mc
+import marcottievents.models.common.enums as enums
+import marcottievents.models.common.events as mce
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from marcottievents.lib.store import EventStore, ACTION_TYPES, MODIFIER_TYPES
+
+
+@pytest.fixture
+def event_store(sqlite_config, tmpdir):
+    marcotti = Marcotti(sqlite_config)
+    marcotti.create_db(ClubSchema)
+    match_id, team_id, lineup_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    event_ids = [uuid.uuid4() for _ in range(3)]
+    action_ids = [uuid.uuid4() for _ in range(3)]
+    with marcotti.connection.begin():
+        marcotti.connection.execute(mce.MatchEvents.__table__.insert(), [
+            dict(id=event_id, domain='club', match_id=match_id, period=1, period_secs=60 * indx,
+                 x=10.5 * indx, y=50.0) for indx, event_id in enumerate(event_ids)])
+        marcotti.connection.execute(mc.ClubMatchEvents.__table__.insert(), [
+            dict(id=event_id, team_id=team_id) for event_id in event_ids])
+        marcotti.connection.execute(mce.MatchActions.__table__.insert(), [
+            dict(id=action_id, event_id=event_id, lineup_id=lineup_id, is_success=indx != 1,
+                 type=enums.ActionType.from_string(action_type),
+                 x_end=99.0 if action_type == "Shot" else None,
+                 match_id=match_id, team_id=team_id, period=1, period_secs=60 * indx)
+            for indx, (action_id, event_id, action_type) in enumerate(zip(action_ids, event_ids,
+                                                                         ["Pass", "Foul", "Shot"]))])
+        marcotti.connection.execute(mce.Modifiers.__table__.insert(), [
+            dict(id=1, type=enums.ModifierType.from_string("Left foot")),
+            dict(id=2, type=enums.ModifierType.from_string("Head"))])
+        marcotti.connection.execute(mce.MatchActionModifiers.__table__.insert(), [
+            dict(id=uuid.uuid4(), action_id=action_ids[2], modifier_id=modifier_id)
+            for modifier_id in [1, 2]])
+    return EventStore(marcotti.connection, str(tmpdir)), match_id, action_ids
+
+
+def test_event_store_schema(event_store):
+    store, match_id, action_ids = event_store
+    schema = pq.read_schema(store.export_match(match_id))
+    types = dict(zip(schema.names, schema.types))
+    assert types['action_id'] == types['match_id'] == pa.binary(16)
+    assert types['x'] == types['x_end'] == pa.float32()
+    assert isinstance(types['type'], pa.DictionaryType)
+    assert isinstance(types['modifier'], pa.DictionaryType)
+
+
+def test_event_store_round_trip(event_store):
+    store, match_id, action_ids = event_store
+    store.export_match(match_id)
+    events = store.read_match(match_id)
+
+    assert len(events) == 4
+    assert list(events.action_id) == [action_ids[0], action_ids[1], action_ids[2], action_ids[2]]
+    assert set(events.match_id) == {match_id}
+    assert list(events.type) == ["Pass", "Foul", "Shot", "Shot"]
+    assert list(events.type.cat.categories) == ACTION_TYPES
+    assert list(events.modifier.cat.categories) == MODIFIER_TYPES
+    assert sorted(events.modifier.dropna()) == ["Head", "Left foot"]
+    assert list(events.is_success) == [True, False, True, True]
+    assert events.x.dtype == 'float32' and list(events.x) == [0.0, 10.5, 21.0, 21.0]
+    assert events.x_end.isnull().sum() == 2